@@ -0,0 +1,160 @@
+# benchmarks/bench_backtest.py - Array backtest engine vs. the original iterrows loop
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+import config
+from src.data_fetcher import DataFetcher
+from src.execution import ExecutionModel
+from src.strategy import TradingStrategy
+from benchmarks.synthetic import make_universe
+
+BARS_PER_YEAR = 252
+
+
+def legacy_backtest(data_with_signals, symbol):
+    """Original per-row TradingStrategy.backtest, kept as the reference"""
+    trades = []
+    cash = config.INITIAL_CAPITAL
+    shares = 0
+
+    for date, row in data_with_signals.iterrows():
+        current_price = row['Close']
+        signal = row['Signal']
+
+        if signal == 1 and shares == 0:  # Buy
+            position_value = (cash + shares * current_price) * config.POSITION_SIZE
+            shares_to_buy = int(position_value / current_price)
+
+            if shares_to_buy > 0 and cash >= shares_to_buy * current_price:
+                shares = shares_to_buy
+                cash -= shares * current_price
+                entry_date = date
+                entry_price = current_price
+
+        elif signal == -1 and shares > 0:  # Sell
+            revenue = shares * current_price
+            cash += revenue
+
+            pnl = revenue - (shares * entry_price)
+            pnl_percent = (pnl / (shares * entry_price)) * 100
+
+            trades.append({
+                'Entry_Date': entry_date,
+                'Exit_Date': date,
+                'Entry_Price': entry_price,
+                'Exit_Price': current_price,
+                'Shares': shares,
+                'PnL': pnl,
+                'PnL_Percent': pnl_percent
+            })
+            shares = 0
+
+    if not trades:
+        return None
+
+    total_trades = len(trades)
+    winning_trades = len([t for t in trades if t['PnL'] > 0])
+    final_value = cash + shares * data_with_signals['Close'].iloc[-1]
+    return {
+        'symbol': symbol,
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'win_rate': winning_trades / total_trades,
+        'total_pnl': sum([t['PnL'] for t in trades]),
+        'total_return': ((final_value - config.INITIAL_CAPITAL) / config.INITIAL_CAPITAL) * 100,
+        'trades': trades
+    }
+
+
+def build_signals(n_symbols, n_bars, seed):
+    """Synthetic universe with indicators and signals, as fetch_all_data builds it"""
+    fetcher = DataFetcher()
+    strategy = TradingStrategy()
+    universe = make_universe(n_symbols, n_bars, seed=seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            symbol: strategy.generate_signals(fetcher.add_indicators(data), symbol)
+            for symbol, data in universe.items()
+        }
+
+
+def same_result(result, expected):
+    """result equals the legacy dict on every key the legacy loop produces"""
+    if result is None or expected is None:
+        return result is expected
+    if any(result[k] != v for k, v in expected.items() if k != 'trades'):
+        return False
+    return len(result['trades']) == len(expected['trades']) and all(
+        all(trade[k] == v for k, v in legacy.items())
+        for trade, legacy in zip(result['trades'], expected['trades'])
+    )
+
+
+def run(backtest, stock_data):
+    """Time one backtest implementation over every symbol"""
+    results = {}
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for symbol, data in stock_data.items():
+            results[symbol] = backtest(data, symbol)
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest engine benchmark')
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--check', type=int, default=25,
+                        help='symbols also run through the legacy loop for equivalence')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    stock_data = build_signals(args.symbols, args.years * BARS_PER_YEAR, args.seed)
+    total_bars = sum(len(d) for d in stock_data.values())
+    print(f"📊 {len(stock_data)} symbols, {total_bars:,} bars")
+
+    results, elapsed = run(TradingStrategy().backtest, stock_data)
+    print(f"⚡ Array engine: {elapsed:.3f}s ({total_bars / elapsed:,.0f} bars/s)")
+
+    subset = dict(list(stock_data.items())[:args.check])
+    subset_bars = sum(len(d) for d in subset.values())
+    expected, legacy_elapsed = run(legacy_backtest, subset)
+    print(f"🐢 iterrows loop: {legacy_elapsed:.3f}s on {len(subset)} symbols "
+          f"({subset_bars / legacy_elapsed:,.0f} bars/s)")
+
+    mismatched = [s for s in subset if not same_result(results[s], expected[s])]
+    traded = sum(1 for s in subset if expected[s])
+    if mismatched:
+        print(f"❌ Results differ for: {', '.join(mismatched)}")
+        sys.exit(1)
+    print(f"✅ Identical results on {len(subset)} symbols ({traded} with trades)")
+
+    # Next-open fills with missing opens: those bars fill at their close, cash stays finite
+    rng = np.random.default_rng(args.seed)
+    gappy = {}
+    for symbol, data in subset.items():
+        data = data.copy()
+        data.loc[rng.random(len(data)) < 0.05, 'Open'] = np.nan
+        gappy[symbol] = data
+    strategy = TradingStrategy(ExecutionModel(fill='next_open'))
+    gappy_results, _ = run(strategy.backtest, gappy)
+    broken = [s for s, r in gappy_results.items()
+              if r and not (np.isfinite(r['total_pnl']) and np.isfinite(r['total_return'])
+                            and all(np.isfinite(t['PnL']) for t in r['trades']))]
+    if broken:
+        print(f"❌ NaN results with missing opens for: {', '.join(broken)}")
+        sys.exit(1)
+    print(f"✅ Finite results with 5% of opens missing ({sum(1 for r in gappy_results.values() if r)} with trades)")
+
+
+if __name__ == "__main__":
+    main()
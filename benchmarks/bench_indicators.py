@@ -0,0 +1,92 @@
+# benchmarks/bench_indicators.py - Indicator kernels: pandas vs. NumPy per symbol vs. NumPy 2-D
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from src.data_fetcher import DataFetcher
+from src.indicators import rsi
+from benchmarks.synthetic import make_universe, FREQUENCIES
+
+
+def timed(fn, universe):
+    """Run fn on fresh copies of every frame; returns (result, seconds)"""
+    frames = {symbol: data.copy() for symbol, data in universe.items()}
+    start = time.perf_counter()
+    result = fn(frames)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Indicator kernel benchmark')
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--bars', type=int, default=2520)
+    parser.add_argument('--freq', choices=FREQUENCIES, default='1d')
+    parser.add_argument('--wilder', action='store_true', help='Wilder-smoothed RSI')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    universe = make_universe(args.symbols, args.bars, seed=args.seed, freq=args.freq)
+    total_bars = sum(len(d) for d in universe.values())
+    print(f"📊 {len(universe)} symbols, {total_bars:,} bars")
+
+    fetcher = DataFetcher(cache_dir='')
+    config.RSI_WILDER = args.wilder
+
+    # RSI alone
+    closes = [data['Close'] for data in universe.values()]
+    start = time.perf_counter()
+    expected = [fetcher.calculate_rsi(close, wilder=args.wilder) for close in closes]
+    pandas_rsi = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = [rsi(close.to_numpy(), wilder=args.wilder) for close in closes]
+    numpy_rsi = time.perf_counter() - start
+    rsi_ok = all(np.allclose(a, e.to_numpy(), rtol=1e-9, equal_nan=True) for a, e in zip(actual, expected))
+    print(f"🐢 pandas RSI:  {pandas_rsi:.3f}s ({total_bars / pandas_rsi:,.0f} bars/s)")
+    print(f"⚡ NumPy RSI:   {numpy_rsi:.3f}s ({pandas_rsi / numpy_rsi:.1f}x) {'✅' if rsi_ok else '❌ values differ'}")
+
+    # Every column add_indicators adds
+    config.INDICATOR_ENGINE = 'pandas'
+    expected, pandas_all = timed(lambda frames: {s: fetcher.add_indicators(d) for s, d in frames.items()},
+                                 universe)
+    config.INDICATOR_ENGINE = 'numpy'
+    per_symbol, numpy_all = timed(lambda frames: {s: fetcher.add_indicators(d) for s, d in frames.items()},
+                                  universe)
+    batched, numpy_2d = timed(fetcher.add_indicators_many, universe)
+
+    def matches(results, expected=expected):
+        try:
+            for symbol, data in expected.items():
+                pd.testing.assert_frame_equal(results[symbol], data, rtol=1e-9)
+        except AssertionError:
+            return '❌ frames differ'
+        return '✅'
+
+    print(f"🐢 pandas add_indicators:     {pandas_all:.3f}s ({total_bars / pandas_all:,.0f} bars/s)")
+    print(f"⚡ NumPy add_indicators:      {numpy_all:.3f}s ({pandas_all / numpy_all:.1f}x) {matches(per_symbol)}")
+    print(f"⚡ NumPy add_indicators_many: {numpy_2d:.3f}s ({pandas_all / numpy_2d:.1f}x) {matches(batched)}")
+
+    # Missing bars: a NaN close must drop and keep the same rows in every engine
+    gappy = {}
+    for i, (symbol, data) in enumerate(list(universe.items())[:20]):
+        data = data.copy()
+        data.iloc[[len(data) // 2 + i, len(data) // 3], data.columns.get_loc('Close')] = np.nan
+        gappy[symbol] = data
+    config.INDICATOR_ENGINE = 'pandas'
+    expected_nan, _ = timed(lambda frames: {s: fetcher.add_indicators(d) for s, d in frames.items()}, gappy)
+    config.INDICATOR_ENGINE = 'numpy'
+    per_symbol, _ = timed(lambda frames: {s: fetcher.add_indicators(d) for s, d in frames.items()}, gappy)
+    batched, _ = timed(fetcher.add_indicators_many, gappy)
+    print(f"🕳️  NaN closes: per symbol {matches(per_symbol, expected_nan)}, "
+          f"2-D {matches(batched, expected_nan)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/bench_parallel_backtest.py - Per-symbol backtests: serial vs. process pool
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import time
+
+import config
+from src.strategy import TradingStrategy
+from src.market_store import MarketStore
+from benchmarks.bench_backtest import build_signals, BARS_PER_YEAR
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel per-symbol backtest benchmark')
+    parser.add_argument('--symbols', type=int, default=1000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    stock_data = MarketStore.from_frames(build_signals(args.symbols, args.years * BARS_PER_YEAR, seed=0))
+    total_bars = stock_data.n_rows()
+    print(f"📊 {len(stock_data)} symbols, {total_bars:,} bars ({os.cpu_count()} CPU cores)")
+
+    # Time the pool for every worker count, however small the universe
+    config.BACKTEST_PARALLEL_MIN_BARS = 0
+    strategy = TradingStrategy()
+    baseline = expected = None
+    for workers in sorted(set(args.workers)):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = strategy.backtest_many(stock_data, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        expected = expected or results
+        status = '✅' if results == expected else '❌ results differ from serial'
+        print(f"⚡ {workers:>3} worker(s): {elapsed:.2f}s "
+              f"({total_bars / elapsed:,.0f} bars/s, {baseline / elapsed:.1f}x) {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# benchmarks/bench_sweep.py - Parameter sweep scaling with worker count
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import time
+
+import config
+from src.sweep import ParameterSweep
+from benchmarks.bench_backtest import build_signals, BARS_PER_YEAR
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parameter sweep benchmark')
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    stock_data = build_signals(args.symbols, args.years * BARS_PER_YEAR, seed=0)
+    combos = len(ParameterSweep().combinations(config.SWEEP_GRID))
+    print(f"📊 {combos} parameter sets x {len(stock_data)} symbols x {args.years} years")
+
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ParameterSweep(workers=workers).run(stock_data)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"⚡ {workers:>3} worker(s): {elapsed:.2f}s "
+              f"({combos / elapsed:,.0f} sets/s, {baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_walk_forward.py - Walk-forward ML probabilities: timing and look-ahead check
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+from src.ml_model import MLPredictor, walk_forward_folds, label_dates
+from src.model_registry import ModelRegistry
+from benchmarks.bench_backtest import build_signals, BARS_PER_YEAR
+from benchmarks.suite import TRAIN_PARAMS
+
+
+def leaked_rows(stock_data, predictor, folds):
+    """Training rows per fold whose Next_Day_Up reads a close on or after the fold start"""
+    dates, labels, valid, next_dates = [], [], [], []
+    for symbol, data in stock_data.items():
+        index = pd.DatetimeIndex(data.index).to_numpy()
+        features = predictor.pipeline.transform(data)
+        dates.append(index)
+        labels.append(label_dates(index))
+        valid.append(~np.isnan(features).any(axis=1) & ~pd.isna(data['Next_Day_Up'].to_numpy()))
+        # Next bar of each row straight from the frame; the last row has none
+        next_dates.append(np.r_[index[1:], np.datetime64('NaT')])
+    dates, labels = np.concatenate(dates), np.concatenate(labels)
+    valid, next_dates = np.concatenate(valid), np.concatenate(next_dates)
+
+    leaks = []
+    for start, train, _ in walk_forward_folds(dates, labels, valid, folds):
+        leaks.append(int((train & ~np.isnat(next_dates) & (next_dates >= start)).sum()))
+    return leaks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Walk-forward probability benchmark')
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--folds', type=int, default=config.ML_GATE_FOLDS)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config.ML_FIXED_PARAMS = TRAIN_PARAMS
+    stock_data = build_signals(args.symbols, args.years * BARS_PER_YEAR, args.seed)
+    total_bars = sum(len(d) for d in stock_data.values())
+    print(f"📊 {len(stock_data)} symbols, {total_bars:,} bars, {args.folds} folds")
+
+    predictor = MLPredictor(registry=ModelRegistry(''))
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        probabilities = predictor.walk_forward_probabilities(stock_data, args.folds)
+    elapsed = time.perf_counter() - start
+    scored = sum(int((~np.isnan(p)).sum()) for p in probabilities.values())
+    print(f"⚡ walk_forward_probabilities: {elapsed:.2f}s ({scored:,} bars scored)")
+
+    leaks = leaked_rows(stock_data, predictor, args.folds)
+    if any(leaks):
+        print(f"❌ Training rows labelled from test bars, per fold: {leaks}")
+        sys.exit(1)
+    print("✅ No fold trains on a label from its own test block")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+# benchmarks/suite.py - Offline benchmark suite with stored, comparable results
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import glob
+import io
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+import config
+from src.data_fetcher import DataFetcher
+from src.strategy import TradingStrategy
+from src.execution import ExecutionModel
+from src.portfolio import PortfolioBacktester
+from src.market_store import MarketStore
+from src.ml_model import MLPredictor
+from src.model_registry import ModelRegistry
+from benchmarks.synthetic import FREQUENCIES, make_universe
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Fixed forest settings so the training benchmark times one fit, not a grid search
+TRAIN_PARAMS = {'n_estimators': 100, 'max_depth': 10, 'min_samples_split': 2, 'max_features': 'sqrt'}
+
+
+class Context:
+    """Synthetic inputs shared by the benchmarks, built once on first use"""
+
+    def __init__(self, symbols, bars, freq, seed, train_symbols):
+        self.symbols = symbols
+        self.bars = bars
+        self.freq = freq
+        self.seed = seed
+        self.train_symbols = train_symbols
+        # Models and tuning results written by the benchmarks; removed by close()
+        self._tmp = tempfile.TemporaryDirectory(prefix='algo_bench_')
+        self.tmp = self._tmp.name
+
+    def close(self):
+        self._tmp.cleanup()
+
+    @cached_property
+    def raw(self):
+        return make_universe(self.symbols, self.bars, seed=self.seed, freq=self.freq)
+
+    @cached_property
+    def indicators(self):
+        fetcher = DataFetcher(cache_dir='')
+        return {s: fetcher.add_indicators(data.copy()) for s, data in self.raw.items()}
+
+    @cached_property
+    def signals(self):
+        strategy = TradingStrategy()
+        return {s: strategy.generate_signals(data, s) for s, data in self.indicators.items()}
+
+    @cached_property
+    def train_data(self):
+        return dict(list(self.signals.items())[:self.train_symbols])
+
+    def predictor(self, name):
+        """Fresh MLPredictor saving to its own temporary model file"""
+        return MLPredictor(registry=ModelRegistry(os.path.join(self.tmp, f'{name}.joblib')))
+
+    @cached_property
+    def trained(self):
+        predictor = self.predictor('trained')
+        predictor.train_model(self.train_data)
+        return predictor
+
+    def count(self, frames):
+        return sum(len(data) for data in frames.values())
+
+
+# Each benchmark returns (setup, run, bars): setup() builds fresh inputs outside
+# the timer, run(inputs) is timed, bars is the work done per run
+def bench_rsi(ctx):
+    """DataFetcher.calculate_rsi over every symbol"""
+    fetcher = DataFetcher(cache_dir='')
+    closes = [data['Close'] for data in ctx.raw.values()]
+    return (lambda: closes,
+            lambda inputs: [fetcher.calculate_rsi(close) for close in inputs],
+            ctx.count(ctx.raw))
+
+
+def bench_indicators(ctx):
+    """DataFetcher.add_indicators over every symbol"""
+    fetcher = DataFetcher(cache_dir='')
+    return (lambda: [data.copy() for data in ctx.raw.values()],
+            lambda inputs: [fetcher.add_indicators(data) for data in inputs],
+            ctx.count(ctx.raw))
+
+
+def bench_indicators_many(ctx):
+    """DataFetcher.add_indicators_many over the whole universe (2-D kernels)"""
+    fetcher = DataFetcher(cache_dir='')
+    return (lambda: {s: data.copy() for s, data in ctx.raw.items()},
+            fetcher.add_indicators_many,
+            ctx.count(ctx.raw))
+
+
+def bench_signals(ctx):
+    """TradingStrategy.generate_signals over every symbol"""
+    strategy = TradingStrategy()
+    return (lambda: ctx.indicators,
+            lambda inputs: [strategy.generate_signals(data, s) for s, data in inputs.items()],
+            ctx.count(ctx.indicators))
+
+
+def bench_backtest(ctx):
+    """TradingStrategy.backtest over every symbol"""
+    strategy = TradingStrategy()
+    return (lambda: ctx.signals,
+            lambda inputs: [strategy.backtest(data, s) for s, data in inputs.items()],
+            ctx.count(ctx.signals))
+
+
+def bench_backtest_costs(ctx):
+    """TradingStrategy.backtest with next-open fills, slippage, fees and a volume cap"""
+    strategy = TradingStrategy(ExecutionModel(fill='next_open', slippage_bps=5, brokerage_pct=0.0003,
+                                              brokerage_max=20, stt_pct=0.001, max_volume_pct=0.01))
+    return (lambda: ctx.signals,
+            lambda inputs: [strategy.backtest(data, s) for s, data in inputs.items()],
+            ctx.count(ctx.signals))
+
+
+def bench_store(ctx):
+    """MarketStore.from_frames packing every symbol into columnar arrays"""
+    return (lambda: ctx.signals,
+            lambda inputs: MarketStore.from_frames(inputs),
+            ctx.count(ctx.signals))
+
+
+def bench_portfolio(ctx):
+    """PortfolioBacktester.run over the whole universe"""
+    return (lambda: ctx.signals,
+            lambda inputs: PortfolioBacktester().run(inputs),
+            ctx.count(ctx.signals))
+
+
+def bench_train(ctx):
+    """MLPredictor.train_model from scratch (fixed hyperparameters)"""
+    runs = itertools.count()
+    return (lambda: ctx.predictor(f'train_{next(runs)}'),
+            lambda predictor: predictor.train_model(ctx.train_data),
+            ctx.count(ctx.train_data))
+
+
+def bench_train_streaming(ctx):
+    """MLPredictor.train_streaming from scratch in 10 chunks (fixed hyperparameters)"""
+    runs = itertools.count()
+    chunk_rows = max(1, ctx.count(ctx.train_data) // 10)
+    return (lambda: ctx.predictor(f'stream_{next(runs)}'),
+            lambda predictor: predictor.train_streaming(ctx.train_data, chunk_rows),
+            ctx.count(ctx.train_data))
+
+
+def bench_tune(ctx):
+    """HyperparameterTuner.search (ML_TUNING) over the training symbols"""
+    from sklearn.preprocessing import StandardScaler
+
+    predictor = ctx.predictor('tune')
+    X, y, _ = predictor._build_dataset(ctx.train_data)
+    X = StandardScaler().fit_transform(X)
+    return (lambda: (X, y),
+            lambda inputs: predictor.tuner.search(*inputs),
+            len(y))
+
+
+def bench_walk_forward(ctx):
+    """MLPredictor.walk_forward_probabilities over the training symbols"""
+    predictor = ctx.predictor('walk_forward')
+    return (lambda: ctx.train_data,
+            predictor.walk_forward_probabilities,
+            ctx.count(ctx.train_data))
+
+
+def bench_predict(ctx):
+    """MLPredictor.predict_batch on every bar of the training symbols"""
+    features = pd.concat(ctx.train_data.values())
+    return (lambda: ctx.trained,
+            lambda predictor: predictor.predict_batch(features),
+            len(features))
+
+
+def bench_predict_latest(ctx):
+    """MLPredictor.predict_batch on the latest bar of every symbol"""
+    latest = pd.DataFrame([data.iloc[-1] for data in ctx.signals.values()], index=list(ctx.signals))
+    return (lambda: ctx.trained,
+            lambda predictor: predictor.predict_batch(latest),
+            len(latest))
+
+
+BENCHMARKS = {
+    'rsi': bench_rsi,
+    'indicators': bench_indicators,
+    'indicators_many': bench_indicators_many,
+    'signals': bench_signals,
+    'backtest': bench_backtest,
+    'backtest_costs': bench_backtest_costs,
+    'store': bench_store,
+    'portfolio': bench_portfolio,
+    'train': bench_train,
+    'train_streaming': bench_train_streaming,
+    'tune': bench_tune,
+    'walk_forward': bench_walk_forward,
+    'predict': bench_predict,
+    'predict_latest': bench_predict_latest,
+}
+
+
+def measure(bench, ctx, repeat):
+    """Time one benchmark; returns min/median/mean seconds and bars/s"""
+    setup, run, bars = bench(ctx)
+    times = []
+    for _ in range(repeat):
+        inputs = setup()
+        start = time.perf_counter()
+        run(inputs)
+        times.append(time.perf_counter() - start)
+
+    best = min(times)
+    return {
+        'min_s': best,
+        'median_s': statistics.median(times),
+        'mean_s': statistics.mean(times),
+        'repeat': repeat,
+        'bars': bars,
+        'bars_per_s': bars / best if best > 0 else None
+    }
+
+
+def environment():
+    """Versions and machine details stored alongside the timings"""
+    import sklearn
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def previous_result(params, exclude=None):
+    """Most recent stored result with the same parameters"""
+    for path in sorted(glob.glob(os.path.join(RESULTS_DIR, '*.json')), reverse=True):
+        if path == exclude:
+            continue
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if stored.get('params') == params:
+            return path, stored
+    return None, None
+
+
+def compare(current, baseline, threshold):
+    """Print timing ratios against a baseline run; returns the names that regressed"""
+    regressed = []
+    print(f"\n📊 vs {baseline['created_at']} ({baseline['environment'].get('commit') or 'unknown commit'}):")
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        ratio = result['min_s'] / before['min_s'] if before['min_s'] else float('inf')
+        flag = '🔴' if ratio > threshold else '🟢' if ratio < 1 / threshold else '⚪'
+        print(f"   {flag} {name:<16} {before['min_s']:9.4f}s -> {result['min_s']:9.4f}s ({ratio:.2f}x)")
+        if ratio > threshold:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite on synthetic data')
+    parser.add_argument('--symbols', type=int, default=50, help='1 to 5000')
+    parser.add_argument('--bars', type=int, default=1260, help='bars per symbol')
+    parser.add_argument('--freq', choices=FREQUENCIES, default='1d')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--train-symbols', type=int, default=20,
+                        help='symbols used by the train/predict benchmarks')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='benchmarks to run')
+    parser.add_argument('--compare', nargs='?', const='latest',
+                        help="stored result to compare against ('latest' matching run by default)")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='slowdown ratio reported (and exited on) as a regression')
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    if not 1 <= args.symbols <= 5000:
+        parser.error('--symbols must be between 1 and 5000')
+
+    params = {'symbols': args.symbols, 'bars': args.bars, 'freq': args.freq, 'seed': args.seed,
+              'train_symbols': min(args.train_symbols, args.symbols)}
+    ctx = Context(args.symbols, args.bars, args.freq, args.seed, params['train_symbols'])
+
+    # Benchmark one forest fit instead of the hyperparameter search
+    config.ML_PARAMS_PATH = os.path.join(ctx.tmp, 'params.json')
+    config.ML_FIXED_PARAMS = TRAIN_PARAMS
+
+    print(f"📊 {args.symbols} symbols x {args.bars} {args.freq} bars, best of {args.repeat}")
+    results = {}
+    try:
+        for name in args.only or BENCHMARKS:
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name] = measure(BENCHMARKS[name], ctx, args.repeat)
+            r = results[name]
+            print(f"⚡ {name:<16} {r['min_s']:9.4f}s (median {r['median_s']:.4f}s, "
+                  f"{r['bars_per_s'] or 0:,.0f} bars/s)")
+    finally:
+        ctx.close()
+
+    current = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'params': params,
+        'environment': environment(),
+        'results': results
+    }
+
+    path = None
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(RESULTS_DIR, f"{stamp}_{args.symbols}x{args.bars}_{args.freq}.json")
+        with open(path, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"📄 Saved {path}")
+
+    if args.compare:
+        if args.compare == 'latest':
+            _, baseline = previous_result(params, exclude=path)
+        else:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        if baseline is None:
+            print("⚠️  No stored run with the same parameters to compare against")
+        elif compare(current, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/synthetic.py - Deterministic synthetic market data for benchmarks
+
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 375   # NSE session, 09:15-15:30
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=15)
+FREQUENCIES = ('1d', '1m')
+
+
+def make_index(n_bars, start='2015-01-01', freq='1d'):
+    """Business-day dates, or minute timestamps within each trading session"""
+    if freq == '1d':
+        return pd.bdate_range(start, periods=n_bars, name='Date')
+    if freq != '1m':
+        raise ValueError(f"Unsupported frequency: {freq}")
+
+    days = pd.bdate_range(start, periods=-(-n_bars // MINUTES_PER_DAY))
+    minutes = SESSION_OPEN + pd.to_timedelta(np.arange(MINUTES_PER_DAY), unit='min')
+    stamps = (days.to_numpy()[:, None] + minutes.to_numpy()[None, :]).ravel()[:n_bars]
+    return pd.DatetimeIndex(stamps, name='Datetime')
+
+
+def make_ohlcv(n_bars, seed=0, start='2015-01-01', start_price=100.0, freq='1d'):
+    """Generate a geometric random walk OHLCV frame at daily or minute frequency"""
+    rng = np.random.default_rng(seed)
+    # Scale drift, volatility and volume down to a per-minute bar
+    bars_per_day = 1 if freq == '1d' else MINUTES_PER_DAY
+    drift = 0.0003 / bars_per_day
+    vol = 0.015 / np.sqrt(bars_per_day)
+
+    returns = rng.normal(drift, vol, n_bars)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = close * np.exp(rng.normal(0, 0.003 / np.sqrt(bars_per_day), n_bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005 / np.sqrt(bars_per_day), n_bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005 / np.sqrt(bars_per_day), n_bars)))
+    volume = rng.lognormal(13 - np.log(bars_per_day), 0.4, n_bars).round()
+
+    return pd.DataFrame({
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': volume
+    }, index=make_index(n_bars, start, freq))
+
+
+def make_universe(n_symbols, n_bars, seed=0, freq='1d'):
+    """Generate a dict of symbol -> OHLCV frame"""
+    return {
+        f"SYN{i:04d}": make_ohlcv(n_bars, seed=seed + i, freq=freq)
+        for i in range(n_symbols)
+    }
@@ -15,10 +15,67 @@ RSI_BUY_THRESHOLD = 30
 RSI_SELL_THRESHOLD = 70
 MA_SHORT_PERIOD = 20
 MA_LONG_PERIOD = 50
+RSI_WILDER = False  # Wilder-smoothed RSI instead of simple averages of gains/losses
+
+# Indicator Computation ('numpy' array kernels, or the 'pandas' reference implementation)
+INDICATOR_ENGINE = 'numpy'
+
+# Parameter Sweep (grid searched by src/sweep.py)
+SWEEP_GRID = {
+    'rsi_buy': [20, 25, 30, 35, 40],
+    'rsi_sell': [60, 65, 70, 75, 80],
+    'ma_short': [5, 10, 15, 20, 30],
+    'ma_long': [40, 50, 100, 150, 200]
+}
+SWEEP_WORKERS = None  # None: one process per CPU core
+
+# Run Instrumentation
+RUN_REPORT_DIR = os.getenv('RUN_REPORT_DIR', 'reports')  # JSON run reports ('' to disable)
+PROFILE = os.getenv('ALGO_PROFILE', '') == '1'            # Also dump a cProfile .prof per run
+
+# In-memory Bar Store and Archive price dtype. float32 halves memory but rounds
+# prices to ~7 significant digits, so fills and indicators computed from the
+# store can differ slightly from the float64 frames; use 'float64' for exact
+# prices. Volumes are always kept in float64.
+STORE_DTYPE = 'float32'
+
+# Long-horizon Archive (import with: python src/archive.py <files>)
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+
+# Market Data Cache (set DATA_CACHE_DIR='' to always download)
+DATA_CACHE_DIR = os.getenv('DATA_CACHE_DIR', 'data_cache')
+DATA_INTERVAL = '1d'
+
+# Data Ingestion
+FETCH_BATCH = True          # Download the whole universe in one request
+FETCH_WORKERS = 8           # Concurrent per-symbol fetches
+FETCH_TIMEOUT = 10          # Seconds per HTTP request
+FETCH_SYMBOL_TIMEOUT = 60   # Seconds per symbol, including retries
+FETCH_RETRIES = 2
+FETCH_RETRY_BACKOFF = 1.0   # Seconds, doubled after every failed attempt
+
+# Live Intraday Mode
+LIVE_INTERVAL = '1m'          # Bar size polled in live mode
+LIVE_POLL_SECONDS = 60        # Seconds between polls
+LIVE_LATENCY_BUDGET = 5.0     # Seconds a cycle may take before it is flagged
+LIVE_LOOKBACK_DAYS = 5        # Days of intraday history used to seed indicators
+LIVE_SEED_BARS = 200          # Bars a replay file uses for seeding
+LIVE_SIGNAL_STATE_PATH = 'live_signal_state.json'  # Live positions, kept apart from daily ones
 
 # Portfolio Settings
 INITIAL_CAPITAL = 100000
 POSITION_SIZE = 0.1
+SIGNAL_STATE_PATH = 'signal_state.json'  # Last position per symbol; only changes are alerted
+BACKTEST_WORKERS = None               # None: one process per CPU core
+BACKTEST_PARALLEL_MIN_BARS = 2_000_000  # Smaller universes are backtested serially
+
+# Backtest Execution Model (defaults: exact fills at the signal bar's close, no costs)
+EXECUTION_FILL = 'close'  # 'close' (signal bar's close) or 'next_open' (following bar's open)
+SLIPPAGE_BPS = 0.0        # Adverse price move per fill, in basis points
+BROKERAGE_PCT = 0.0       # Brokerage as a fraction of traded value (e.g. 0.0003)
+BROKERAGE_MAX = None      # Brokerage cap per order in ₹ (e.g. 20)
+STT_PCT = 0.0             # Securities transaction tax on buys and sells (e.g. 0.001 for delivery)
+MAX_VOLUME_PCT = None     # Largest share of a bar's Volume one entry may take (e.g. 0.01)
 
 # Google Sheets
 SPREADSHEET_NAME = 'Algo Trading Results'
@@ -26,8 +83,31 @@ SPREADSHEET_NAME = 'Algo Trading Results'
 # ML Model Settings
 ML_TEST_SIZE = 0.2
 ML_RANDOM_STATE = 42
+ML_PARAMS_PATH = 'ml_best_params.json'  # Cached hyperparameter search results
+ML_TUNING = 'halving'                   # 'halving' (successive halving) or 'grid' (exhaustive)
+ML_RETUNE_DAYS = 7                      # Re-search hyperparameters after this many days (None: never)
+ML_DRIFT_THRESHOLD = 0.5                # ...or once features/target shift this many std devs
+ML_FIXED_PARAMS = None                  # Fixed RF hyperparameters instead of searching
+ML_MODEL_PATH = 'models/ml_model.joblib'  # Saved model, scaler and fingerprints
+ML_WARM_START_TREES = 10                # Trees added per retrain on new bars
+ML_WARM_START_MIN_ROWS = 20             # New rows needed before adding trees
+ML_MAX_TREES = 400                      # Full refit once the forest grows past this
+ML_STREAMING_ROWS = 2_000_000           # Train chunk by chunk above this many rows (None: never)
+ML_CHUNK_ROWS = 250_000                 # Training rows per chunk when streaming
+ML_GATE_BACKTEST = False                # Also run the ML-gated backtest in full runs
+ML_GATE_FOLDS = 4                       # Walk-forward refits for historical predictions
+ML_GATE_THRESHOLD = 0.55                # ML_Prob_Up a BUY needs to pass the gate
 
 # Telegram Bot (Optional)
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', 'YOURS')
 
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID', 'YOURS')
+
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+TELEGRAM_ASYNC = True            # Send from a background worker thread
+TELEGRAM_QUEUE_SIZE = 100        # Messages buffered before new ones are dropped
+TELEGRAM_MIN_INTERVAL = 1.0      # Seconds between requests (per-chat limit)
+TELEGRAM_TIMEOUT = 10
+TELEGRAM_RETRIES = 3
+TELEGRAM_RETRY_BACKOFF = 1.0     # Seconds, doubled after every failed attempt
+TELEGRAM_CLOSE_TIMEOUT = 30      # Seconds to wait for queued messages at exit
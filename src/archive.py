@@ -0,0 +1,300 @@
+# src/archive.py - Memory-mapped long-horizon bar archive
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+import config
+from src.data_cache import OHLCV_COLUMNS
+from src.market_store import utc_ns, field_dtype
+
+
+def _bound_ns(value, tz=None):
+    """Timestamp/date string as UTC nanoseconds; naive values are read in tz"""
+    if value is None:
+        return None
+    value = pd.Timestamp(value)
+    if value.tz is None and tz:
+        value = value.tz_localize(tz)
+    if value.tz is not None:
+        value = value.tz_convert('UTC').tz_localize(None)
+    return value.as_unit('ns').value
+
+
+def read_bars(path):
+    """Read an OHLCV file (.csv or .parquet) into a date-indexed frame"""
+    if path.lower().endswith(('.parquet', '.pq')):
+        # Needs pyarrow or fastparquet
+        data = pd.read_parquet(path)
+    else:
+        data = pd.read_csv(path)
+
+    if not isinstance(data.index, pd.DatetimeIndex):
+        date_column = next((c for c in data.columns
+                            if str(c).lower() in ('date', 'datetime', 'timestamp', 'time')),
+                           data.columns[0])
+        data = data.set_index(pd.DatetimeIndex(pd.to_datetime(data.pop(date_column))))
+
+    data = data.rename(columns={c: c.title() for c in data.columns if c.title() in OHLCV_COLUMNS})
+    missing = [c for c in OHLCV_COLUMNS if c not in data.columns]
+    if missing:
+        raise ValueError(f"{path}: missing columns {', '.join(missing)}")
+    return data[OHLCV_COLUMNS]
+
+
+class ArchiveView(Mapping):
+    """Lazy {symbol: frame} over an archive date range
+
+    Each access reads one symbol's zero-copy slice and passes it through
+    prepare (e.g. indicators + signals), so iterating streams symbol by
+    symbol instead of loading the whole archive.
+    """
+
+    def __init__(self, archive, symbols, start=None, end=None, prepare=None):
+        self.archive = archive
+        self.symbols = list(symbols)
+        self.start = start
+        self.end = end
+        self.prepare = prepare
+
+    def __getitem__(self, symbol):
+        if symbol not in self.symbols:
+            raise KeyError(symbol)
+        data = self.archive.read(symbol, self.start, self.end)
+        return self.prepare(data, symbol) if self.prepare else data
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def n_rows(self):
+        """Stored bars in range (before prepare drops any), without reading them"""
+        return sum(self.archive._rows(s, self.start, self.end).stop
+                   - self.archive._rows(s, self.start, self.end).start for s in self.symbols)
+
+
+class MarketArchive:
+    """Append-only memory-mapped OHLCV archive for many symbols
+
+    Every field is one flat binary file (<directory>/<field>.bin) holding all
+    symbols' bars back to back, with UTC nanosecond timestamps in dates.bin.
+    index.json maps each symbol to its row range, so a symbol/date-range
+    read is a binary search plus slicing of np.memmap arrays - nothing is
+    loaded until it is touched. Rewriting a symbol appends a new segment;
+    compact() drops the superseded ones.
+    """
+
+    def __init__(self, directory=None, interval=None, dtype=None):
+        self.directory = directory or config.ARCHIVE_DIR
+        self.index_path = os.path.join(self.directory, 'index.json')
+        self._maps = {}
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+            if interval and interval != self.index['interval']:
+                raise ValueError(f"Archive {self.directory} holds {self.index['interval']} bars, not {interval}")
+        else:
+            self.index = {
+                'interval': interval or config.DATA_INTERVAL,
+                'dtype': np.dtype(dtype or config.STORE_DTYPE).name,
+                'dtypes': {c: field_dtype(c, dtype or config.STORE_DTYPE).name for c in OHLCV_COLUMNS},
+                'columns': OHLCV_COLUMNS,
+                'rows': 0,
+                'symbols': {}
+            }
+
+    @property
+    def symbols(self):
+        return list(self.index['symbols'])
+
+    def __contains__(self, symbol):
+        return symbol in self.index['symbols']
+
+    def _file(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _dtype(self, name):
+        """On-disk dtype of one field (archives without 'dtypes' store every column as 'dtype')"""
+        if name == 'dates':
+            return np.dtype(np.int64)
+        return np.dtype(self.index.get('dtypes', {}).get(name, self.index['dtype']))
+
+    def _map(self, name):
+        """Read-only memmap of one field over the indexed rows"""
+        if name not in self._maps:
+            dtype = self._dtype(name)
+            rows = self.index['rows']
+            self._maps[name] = (np.memmap(self._file(name), dtype=dtype, mode='r', shape=(rows,))
+                                if rows else np.empty(0, dtype=dtype))
+        return self._maps[name]
+
+    def _rows(self, symbol, start=None, end=None):
+        """Row slice of a symbol's bars in [start, end)"""
+        entry = self.index['symbols'][symbol]
+        lo, hi = entry['start'], entry['stop']
+        dates = self._map('dates')[lo:hi]
+        start_ns, end_ns = _bound_ns(start, entry['tz']), _bound_ns(end, entry['tz'])
+        first = np.searchsorted(dates, start_ns) if start_ns is not None else 0
+        last = np.searchsorted(dates, end_ns) if end_ns is not None else hi - lo
+        return slice(lo + first, lo + last)
+
+    def date_range(self, symbol):
+        """(first, last) UTC timestamp stored for a symbol"""
+        entry = self.index['symbols'][symbol]
+        return pd.Timestamp(entry['first']), pd.Timestamp(entry['last'])
+
+    def _frame(self, symbol, rows):
+        index = pd.DatetimeIndex(self._map('dates')[rows].view('M8[ns]'), name='Date')
+        tz = self.index['symbols'][symbol]['tz']
+        return pd.DataFrame({c: self._map(c)[rows] for c in self.index['columns']},
+                            index=index.tz_localize('UTC').tz_convert(tz) if tz else index,
+                            copy=False)
+
+    def read(self, symbol, start=None, end=None):
+        """Bars in [start, end) as a DataFrame over zero-copy memmap views"""
+        return self._frame(symbol, self._rows(symbol, start, end))
+
+    def iter_chunks(self, symbol, start=None, end=None, chunk_rows=1_000_000):
+        """Yield a symbol's [start, end) bars in frames of at most chunk_rows rows"""
+        rows = self._rows(symbol, start, end)
+        for lo in range(rows.start, rows.stop, chunk_rows):
+            yield self._frame(symbol, slice(lo, min(lo + chunk_rows, rows.stop)))
+
+    def view(self, start=None, end=None, symbols=None, prepare=None):
+        """Lazy {symbol: frame} mapping over [start, end) (see ArchiveView)"""
+        return ArchiveView(self, symbols or self.symbols, start, end, prepare)
+
+    def write(self, symbol, data):
+        """Add or extend a symbol's bars; rows for dates already stored are replaced"""
+        data = data[OHLCV_COLUMNS]
+        if data.empty:
+            return
+        tz = str(data.index.tz) if data.index.tz is not None else None
+        stamps = utc_ns(data.index)
+        values = {c: data[c].to_numpy() for c in OHLCV_COLUMNS}
+
+        if symbol in self:
+            tz = tz or self.index['symbols'][symbol]['tz']
+            rows = self._rows(symbol)
+            stamps = np.concatenate([self._map('dates')[rows], stamps])
+            values = {c: np.concatenate([self._map(c)[rows], values[c]]) for c in OHLCV_COLUMNS}
+
+        # Sort by time, keeping the last occurrence of duplicate timestamps
+        order = np.argsort(stamps, kind='stable')
+        stamps = stamps[order]
+        keep = np.r_[stamps[1:] != stamps[:-1], True]
+        stamps = stamps[keep]
+        values = {c: v[order][keep] for c, v in values.items()}
+
+        self._append({symbol: (stamps, values, tz)})
+
+    def _append(self, segments):
+        """Append {symbol: (stamps, values, tz)} segments and commit the index"""
+        os.makedirs(self.directory, exist_ok=True)
+        rows = self.index['rows']
+        self._maps = {}
+
+        # Bytes past index['rows'] are ignored, so a crash here loses nothing
+        files = {name: open(self._file(name), 'r+b' if os.path.exists(self._file(name)) else 'wb')
+                 for name in ['dates'] + self.index['columns']}
+        try:
+            for name, f in files.items():
+                f.seek(rows * self._dtype(name).itemsize)
+                f.truncate()
+            for symbol, (stamps, values, tz) in segments.items():
+                files['dates'].write(np.ascontiguousarray(stamps, dtype=np.int64).tobytes())
+                for c in self.index['columns']:
+                    files[c].write(np.ascontiguousarray(values[c], dtype=self._dtype(c)).tobytes())
+                self.index['symbols'][symbol] = {
+                    'start': rows,
+                    'stop': rows + len(stamps),
+                    'tz': tz,
+                    'first': str(pd.Timestamp(stamps[0], unit='ns')) if len(stamps) else None,
+                    'last': str(pd.Timestamp(stamps[-1], unit='ns')) if len(stamps) else None
+                }
+                rows += len(stamps)
+        finally:
+            for f in files.values():
+                f.close()
+
+        self.index['rows'] = rows
+        self._save_index()
+
+    def _save_index(self):
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, self.index_path)
+
+    @property
+    def live_rows(self):
+        return sum(e['stop'] - e['start'] for e in self.index['symbols'].values())
+
+    def compact(self):
+        """Rewrite the archive without segments superseded by later writes"""
+        if self.live_rows == self.index['rows']:
+            return
+        compacted = MarketArchive(self.directory + '.compact', self.index['interval'], self.index['dtype'])
+        for symbol in self.symbols:
+            rows = self._rows(symbol)
+            compacted._append({symbol: (
+                self._map('dates')[rows],
+                {c: self._map(c)[rows] for c in self.index['columns']},
+                self.index['symbols'][symbol]['tz']
+            )})
+
+        self._maps = {}
+        for name in ['dates'] + self.index['columns']:
+            os.replace(compacted._file(name), self._file(name))
+        os.replace(compacted.index_path, self.index_path)
+        os.rmdir(compacted.directory)
+        self.index = compacted.index
+
+    def import_files(self, paths, symbols=None):
+        """Import CSV/Parquet files (symbol taken from the file name unless given)"""
+        symbols = symbols or [os.path.splitext(os.path.basename(p))[0] for p in paths]
+        imported = 0
+        for path, symbol in zip(paths, symbols):
+            try:
+                data = read_bars(path)
+                self.write(symbol, data)
+                first, last = self.date_range(symbol)
+                print(f"✅ {symbol}: {len(data)} bars imported ({first.date()} to {last.date()})")
+                imported += 1
+            except Exception as e:
+                print(f"❌ Error importing {path}: {str(e)}")
+        return imported
+
+
+def main():
+    """Import CSV/Parquet bar files into an archive"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Import OHLCV files into the memory-mapped archive')
+    parser.add_argument('files', nargs='+', help='.csv or .parquet files, one symbol each')
+    parser.add_argument('--archive', default=config.ARCHIVE_DIR)
+    parser.add_argument('--interval', default=config.DATA_INTERVAL)
+    parser.add_argument('--symbols', nargs='+', help='symbols for the files (default: file names)')
+    parser.add_argument('--compact', action='store_true', help='drop superseded rows afterwards')
+    args = parser.parse_args()
+
+    if args.symbols and len(args.symbols) != len(args.files):
+        parser.error('--symbols needs one symbol per file')
+
+    archive = MarketArchive(args.archive, args.interval)
+    imported = archive.import_files(args.files, args.symbols)
+    if args.compact:
+        archive.compact()
+    print(f"📦 {imported}/{len(args.files)} files imported; archive holds "
+          f"{len(archive.symbols)} symbols, {archive.live_rows:,} bars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# src/backtest_engine.py
+
+import numpy as np
+from src.execution import ExecutionModel, BUY, SELL
+
+# Exact fills at the signal bar's close, no costs
+FRICTIONLESS = ExecutionModel(fill='close', slippage_bps=0, brokerage_pct=0, stt_pct=0, max_volume_pct=0)
+
+
+def simulate_long_only(close, signal, initial_capital, position_size, execution=None,
+                       open_=None, volume=None):
+    """Run the long-only buy/sell state machine over price and signal arrays.
+
+    Only bars with a non-zero signal can change state, so the arrays are
+    compressed to runs of identical signals and the Python loop walks runs
+    instead of bars. Without an execution model (or with a frictionless
+    one) arithmetic matches the original per-row loop exactly.
+
+    execution (an ExecutionModel) sets the fill bar and price, slippage,
+    fees and volume cap; open_ and volume are needed for 'next_open' fills
+    and volume caps. Cash is net of all costs, so they compound into later
+    position sizes. Orders that would fill past the last bar are dropped.
+
+    Returns (entry_idx, exit_idx, shares, cash, open_shares) where the first
+    three describe closed trades (fill bars) and cash/open_shares the final
+    state.
+    """
+    execution = execution or FRICTIONLESS
+    close = np.asarray(close, dtype=np.float64)
+    signal = np.asarray(signal)
+    n_bars = len(close)
+    charges_fees = execution.charges_fees
+    # Per-bar fill prices and entry size limits, computed once up front
+    base = execution.base_prices(close, open_)
+    buy_prices = execution.fill_prices(base, BUY)
+    sell_prices = execution.fill_prices(base, SELL)
+    limits = execution.capacity(volume)
+
+    entry_idx, exit_idx, trade_shares = [], [], []
+    cash = initial_capital
+    shares = 0
+    entry = None
+
+    active = np.flatnonzero(signal)
+    if active.size == 0:
+        return (np.array(entry_idx, dtype=np.int64), np.array(exit_idx, dtype=np.int64),
+                np.array(trade_shares, dtype=np.int64), cash, shares)
+
+    values = signal[active]
+    run_starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    run_ends = np.r_[run_starts[1:], active.size]
+
+    for start, end in zip(run_starts, run_ends):
+        if values[start] == 1 and shares == 0:  # Buy
+            bars = execution.fill_bars(active[start:end])
+            bars = bars[bars < n_bars]
+            prices = buy_prices[bars]
+            position_value = cash * position_size
+            qty = np.floor(position_value / (prices * (1 + execution.fee_rate)))
+            if limits is not None:
+                qty = np.minimum(qty, limits[bars])
+            cost = qty * prices
+            if charges_fees:
+                cost = cost + execution.fees(cost)
+            filled = np.flatnonzero((qty > 0) & (cash >= cost))
+            if filled.size:
+                first = filled[0]
+                shares = int(qty[first])
+                cash -= cost[first]
+                entry = bars[first]
+
+        elif values[start] == -1 and shares > 0:  # Sell
+            bar = execution.fill_bars(active[start])
+            if bar >= n_bars:
+                continue
+            revenue = shares * sell_prices[bar]
+            cash += revenue - execution.fees(revenue) if charges_fees else revenue
+            entry_idx.append(entry)
+            exit_idx.append(bar)
+            trade_shares.append(shares)
+            shares = 0
+
+    return (np.array(entry_idx, dtype=np.int64), np.array(exit_idx, dtype=np.int64),
+            np.array(trade_shares, dtype=np.int64), cash, shares)
+
+
+def simulate_many(jobs, initial_capital, position_size, execution=None):
+    """simulate_long_only over a list of (close, signal, open, volume) jobs; process-pool entry point"""
+    return [simulate_long_only(close, signal, initial_capital, position_size, execution, open_, volume)
+            for close, signal, open_, volume in jobs]
@@ -0,0 +1,195 @@
+# src/data_cache.py
+
+import os
+import json
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class YahooSource:
+    """Download OHLCV history from Yahoo Finance"""
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+
+    def history(self, symbol, start, end, interval='1d'):
+        import yfinance as yf
+        return yf.Ticker(symbol).history(start=start, end=end, interval=interval,
+                                         timeout=self.timeout)
+
+    def history_batch(self, symbols, start, end, interval='1d'):
+        """Download many symbols with one yf.download call, returning {symbol: frame}"""
+        import yfinance as yf
+        data = yf.download(symbols, start=start, end=end, interval=interval,
+                           group_by='ticker', auto_adjust=True, ignore_tz=False,
+                           threads=True, progress=False, timeout=self.timeout)
+        if data is None or data.empty:
+            return {}
+
+        available = set(data.columns.get_level_values(0))
+        return {
+            symbol: data[symbol].dropna(how='all')
+            for symbol in symbols if symbol in available
+        }
+
+
+class CSVSource:
+    """Serve OHLCV history from <directory>/<symbol>.csv files (offline stand-in for Yahoo)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def history(self, symbol, start, end, interval='1d'):
+        path = os.path.join(self.directory, f"{symbol}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        data = pd.read_csv(path, index_col=0, parse_dates=True)
+        data.index.name = 'Date'
+        start, end = _bound(data.index, start), _bound(data.index, end)
+        return data[(data.index >= start) & (data.index < end)]
+
+
+class OHLCVCache:
+    """Persistent per-symbol OHLCV cache that only downloads missing ranges
+
+    Each symbol/interval is stored as memory-mapped NumPy arrays
+    (<cache_dir>/<interval>/<symbol>/dates.npy and bars.npy) plus a small
+    meta.json recording the requested date range already covered. The last
+    cached bar is always re-requested on refresh since it may have been
+    partial when it was stored.
+    """
+
+    def __init__(self, cache_dir, source=None):
+        self.cache_dir = cache_dir
+        self.source = source or YahooSource()
+        self.network_calls = 0
+
+    def _path(self, symbol, interval):
+        return os.path.join(self.cache_dir, interval, symbol)
+
+    def load(self, symbol, interval='1d'):
+        """Return (frame, meta) for a cached symbol, or (None, None)"""
+        path = self._path(symbol, interval)
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+            dates = np.load(os.path.join(path, 'dates.npy'), mmap_mode='r')
+            bars = np.load(os.path.join(path, 'bars.npy'), mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            return None, None
+
+        index = pd.DatetimeIndex(pd.to_datetime(np.asarray(dates), unit='ns', utc=True), name='Date')
+        index = index.tz_convert(meta['tz']) if meta.get('tz') else index.tz_localize(None)
+        return pd.DataFrame(np.asarray(bars), index=index, columns=OHLCV_COLUMNS), meta
+
+    def save(self, symbol, data, start, end, interval='1d'):
+        """Write a frame and the date range it covers, replacing the old entry atomically"""
+        path = self._path(symbol, interval)
+        os.makedirs(path, exist_ok=True)
+
+        index = data.index
+        tz = str(index.tz) if index.tz is not None else None
+        utc = index.tz_convert('UTC') if tz else index.tz_localize('UTC')
+        arrays = {
+            'dates.npy': utc.as_unit('ns').asi8.astype(np.int64),
+            'bars.npy': data[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+        }
+        for name, array in arrays.items():
+            tmp = os.path.join(path, name + '.tmp')
+            with open(tmp, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp, os.path.join(path, name))
+
+        tmp = os.path.join(path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'start': start, 'end': end, 'tz': tz}, f)
+        os.replace(tmp, os.path.join(path, 'meta.json'))
+
+    def _normalize(self, data):
+        if data is None or data.empty:
+            return None
+        return data[OHLCV_COLUMNS].astype(np.float64)
+
+    def _download(self, symbol, start, end, interval):
+        self.network_calls += 1
+        return self._normalize(self.source.history(symbol, start, end, interval=interval))
+
+    def _download_batch(self, symbols, start, end, interval):
+        """Download one range for several symbols, in a single request when the source allows it"""
+        if len(symbols) == 1 or not hasattr(self.source, 'history_batch'):
+            return {symbol: self._download(symbol, start, end, interval) for symbol in symbols}
+
+        self.network_calls += 1
+        frames = self.source.history_batch(symbols, start, end, interval=interval)
+        return {symbol: self._normalize(frames.get(symbol)) for symbol in symbols}
+
+    def _missing(self, cached, meta, start, end):
+        """Date ranges that must be downloaded to serve [start, end)"""
+        if cached is None:
+            return [(start, end)]
+
+        ranges = []
+        if start < meta['start']:
+            ranges.append((start, meta['start']))
+        if end > meta['end']:
+            # Refresh from the last cached bar so a partial bar gets replaced
+            refresh_from = cached.index[-1].strftime('%Y-%m-%d') if len(cached) else meta['end']
+            ranges.append((refresh_from, end))
+        return ranges
+
+    def _merge(self, symbol, cached, meta, downloads, start, end, interval):
+        """Combine cached and downloaded bars, persist the result and slice [start, end)"""
+        parts = [cached] if cached is not None else []
+        parts += [d for d in downloads if d is not None]
+        if not parts:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        data = parts[0]
+        if len(parts) > 1:
+            data = pd.concat(parts)
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+
+        covered_start = min(start, meta['start']) if meta else start
+        covered_end = max(end, meta['end']) if meta else end
+        if meta is None or (covered_start, covered_end) != (meta['start'], meta['end']):
+            self.save(symbol, data, covered_start, covered_end, interval)
+
+        lo, hi = _bound(data.index, start), _bound(data.index, end)
+        return data[(data.index >= lo) & (data.index < hi)]
+
+    def history(self, symbol, start, end, interval='1d'):
+        """Return OHLCV bars in [start, end), downloading only what is not cached"""
+        cached, meta = self.load(symbol, interval)
+        downloads = [self._download(symbol, s, e, interval)
+                     for s, e in self._missing(cached, meta, start, end)]
+        return self._merge(symbol, cached, meta, downloads, start, end, interval)
+
+    def history_many(self, symbols, start, end, interval='1d'):
+        """Like history() for many symbols, batching symbols that miss the same range"""
+        state = {symbol: self.load(symbol, interval) for symbol in symbols}
+
+        wanted = {}
+        for symbol, (cached, meta) in state.items():
+            for missing in self._missing(cached, meta, start, end):
+                wanted.setdefault(missing, []).append(symbol)
+
+        downloads = {symbol: [] for symbol in symbols}
+        for (s, e), group in wanted.items():
+            for symbol, data in self._download_batch(group, s, e, interval).items():
+                downloads[symbol].append(data)
+
+        return {
+            symbol: self._merge(symbol, cached, meta, downloads[symbol], start, end, interval)
+            for symbol, (cached, meta) in state.items()
+        }
+
+
+def _bound(index, date):
+    """Convert a 'YYYY-MM-DD' date to a timestamp comparable with index"""
+    ts = pd.Timestamp(date)
+    if index.tz is not None:
+        ts = ts.tz_localize(index.tz)
+    return ts
@@ -1,56 +1,196 @@
 # # src/data_fetcher.py
 
-import yfinance as yf
+import math
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import pandas as pd
 import numpy as np
+import config
+from src.data_cache import OHLCVCache, YahooSource
+from src.indicators import indicator_arrays
+
+# Rows add_indicators drops when any of these is NaN
+REQUIRED_COLUMNS = ['RSI', 'MA_20', 'MA_50', 'MACD', 'Volume_Ratio', 'Next_Day_Up']
 
 class DataFetcher:
     """Handle stock data fetching and technical indicators"""
     
-    def __init__(self):
-        pass
+    def __init__(self, source=None, cache_dir=config.DATA_CACHE_DIR, instrumentation=None):
+        self.source = source or YahooSource(timeout=config.FETCH_TIMEOUT)
+        self.cache = OHLCVCache(cache_dir, self.source) if cache_dir else None
+        self.instrumentation = instrumentation
+        self.direct_calls = 0
+    
+    @property
+    def network_calls(self):
+        """Download requests made so far (cache hits excluded)"""
+        return self.direct_calls + (self.cache.network_calls if self.cache else 0)
     
-    def calculate_rsi(self, prices, period=14):
+    def calculate_rsi(self, prices, period=14, wilder=False):
         """Calculate RSI indicator"""
         delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+        gain = delta.where(delta > 0, 0)
+        loss = -delta.where(delta < 0, 0)
+        if wilder:
+            gain = gain.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+            loss = loss.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+        else:
+            gain = gain.rolling(window=period).mean()
+            loss = loss.rolling(window=period).mean()
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
         return rsi
     
-    def fetch_stock_data(self, symbol, start_date, end_date):
-        """Fetch stock data and add technical indicators"""
+    def add_indicators(self, data):
+        """Add technical indicators and ML target to an OHLCV frame
+        
+        Uses the NumPy kernels in src/indicators.py unless INDICATOR_ENGINE
+        is 'pandas'; both produce the same columns and keep the same rows,
+        NaN bars included, with values equal to within float rounding. Use
+        the returned frame: the NumPy path builds a new one instead of adding
+        columns one by one.
+        """
+        if config.INDICATOR_ENGINE == 'pandas':
+            return self.add_indicators_pandas(data)
+        
+        columns = indicator_arrays(data['Close'].to_numpy(), data['Volume'].to_numpy(),
+                                   (config.MA_SHORT_PERIOD, config.MA_LONG_PERIOD),
+                                   wilder=config.RSI_WILDER)
+        return self._with_indicators(data, columns)
+    
+    def add_indicators_many(self, frames):
+        """add_indicators for {symbol: frame}, one 2-D kernel pass per trading calendar
+        
+        Symbols sharing an identical index are stacked into (bars x symbols)
+        matrices so every indicator is computed for all of them at once.
+        If a group fails its symbols are retried one by one, and only the
+        ones that fail again are set to None. Returns a new {symbol: frame};
+        None or empty entries are passed through.
+        """
+        if config.INDICATOR_ENGINE == 'pandas':
+            return {s: self._add_indicators_one(s, data) if data is not None and not data.empty else data
+                    for s, data in frames.items()}
+        
+        groups = []
+        for symbol, data in frames.items():
+            if data is None or data.empty:
+                continue
+            group = next((g for g in groups if g[0][1].index.equals(data.index)), None)
+            if group is None:
+                groups.append([(symbol, data)])
+            else:
+                group.append((symbol, data))
+        
+        results = dict(frames)
+        for group in groups:
+            try:
+                # Column-major so each symbol's column is contiguous
+                close = np.asfortranarray(np.column_stack([data['Close'].to_numpy(dtype=np.float64)
+                                                           for _, data in group]))
+                volume = np.asfortranarray(np.column_stack([data['Volume'].to_numpy(dtype=np.float64)
+                                                            for _, data in group]))
+                columns = indicator_arrays(close, volume, (config.MA_SHORT_PERIOD, config.MA_LONG_PERIOD),
+                                           wilder=config.RSI_WILDER)
+                for j, (symbol, data) in enumerate(group):
+                    results[symbol] = self._with_indicators(data, {name: values[:, j]
+                                                                   for name, values in columns.items()})
+            except Exception as e:
+                print(f"⚠️  Batched indicators failed ({str(e)}), retrying {len(group)} symbols one by one")
+                for symbol, data in group:
+                    results[symbol] = self._add_indicators_one(symbol, data)
+        return results
+    
+    def _add_indicators_one(self, symbol, data):
+        """add_indicators for one symbol, or None if it fails"""
         try:
-            print(f"📊 Fetching data for {symbol}...")
-            
-            # Download data
-            stock = yf.Ticker(symbol)
-            data = stock.history(start=start_date, end=end_date)
+            return self.add_indicators(data)
+        except Exception as e:
+            print(f"❌ Error adding indicators for {symbol}: {str(e)}")
+            return None
+    
+    def _with_indicators(self, data, columns):
+        """data plus the indicator columns, without rows missing a required value"""
+        keep = np.ones(len(data), dtype=bool)
+        for name in REQUIRED_COLUMNS:
+            keep &= ~np.isnan(columns[name])
+        values = {c: data[c].to_numpy()[keep] for c in data.columns if c not in columns}
+        values.update({name: column[keep] for name, column in columns.items()})
+        return pd.DataFrame(values, index=data.index[keep], copy=False)
+    
+    def add_indicators_pandas(self, data):
+        """Reference pandas implementation of add_indicators"""
+        data['RSI'] = self.calculate_rsi(data['Close'], wilder=config.RSI_WILDER)
+        data['MA_20'] = data['Close'].rolling(window=20).mean()
+        data['MA_50'] = data['Close'].rolling(window=50).mean()
+        for period in (config.MA_SHORT_PERIOD, config.MA_LONG_PERIOD):
+            if f'MA_{period}' not in data:
+                data[f'MA_{period}'] = data['Close'].rolling(window=period).mean()
+        
+        # MACD for ML
+        exp1 = data['Close'].ewm(span=12).mean()
+        exp2 = data['Close'].ewm(span=26).mean()
+        data['MACD'] = exp1 - exp2
+        
+        # Volume ratio
+        data['Volume_MA'] = data['Volume'].rolling(window=20).mean()
+        data['Volume_Ratio'] = data['Volume'] / data['Volume_MA']
+        
+        # ML target
+        data['Next_Day_Up'] = (data['Close'].shift(-1) > data['Close']).astype(int)
+        
+        # Drop rows with NaN in important ML fields
+        data.dropna(subset=REQUIRED_COLUMNS, inplace=True)
+        return data
+    
+    def download(self, symbol, start_date, end_date):
+        """Download raw bars through the cache, retrying failures with backoff"""
+        for attempt in range(config.FETCH_RETRIES + 1):
+            try:
+                # Serve from the local cache, downloading only missing bars
+                if self.cache:
+                    return self.cache.history(symbol, start_date, end_date, config.DATA_INTERVAL)
+                self.direct_calls += 1
+                return self.source.history(symbol, start_date, end_date, interval=config.DATA_INTERVAL)
+            except Exception as e:
+                if attempt == config.FETCH_RETRIES:
+                    raise
+                print(f"⚠️ {symbol}: attempt {attempt + 1} failed ({str(e)}), retrying...")
+                time.sleep(config.FETCH_RETRY_BACKOFF * 2 ** attempt)
+    
+    def download_many(self, symbols, start_date, end_date):
+        """Download raw bars for many symbols in one batched request where possible"""
+        try:
+            if self.cache:
+                return self.cache.history_many(symbols, start_date, end_date, config.DATA_INTERVAL)
+            if hasattr(self.source, 'history_batch'):
+                self.direct_calls += 1
+                return self.source.history_batch(symbols, start_date, end_date,
+                                                 interval=config.DATA_INTERVAL)
+        except Exception as e:
+            print(f"⚠️ Batch download failed ({str(e)}), fetching per symbol")
+        return {}
+    
+    def fetch_stock_data(self, symbol, start_date, end_date, data=None, indicators=True):
+        """Fetch stock data and add technical indicators
+        
+        Pass already downloaded bars as data to skip the download, and
+        indicators=False to get the raw bars.
+        """
+        try:
+            if data is None:
+                print(f"📊 Fetching data for {symbol}...")
+                data = self.download(symbol, start_date, end_date)
             
             if data.empty:
                 print(f"❌ No data for {symbol}")
                 return None
             
-            # Add technical indicators
-            data['RSI'] = self.calculate_rsi(data['Close'])
-            data['MA_20'] = data['Close'].rolling(window=20).mean()
-            data['MA_50'] = data['Close'].rolling(window=50).mean()
-            
-            # MACD for ML
-            exp1 = data['Close'].ewm(span=12).mean()
-            exp2 = data['Close'].ewm(span=26).mean()
-            data['MACD'] = exp1 - exp2
-            
-            # Volume ratio
-            data['Volume_MA'] = data['Volume'].rolling(window=20).mean()
-            data['Volume_Ratio'] = data['Volume'] / data['Volume_MA']
+            if not indicators:
+                return data
             
-            # ML target
-            data['Next_Day_Up'] = (data['Close'].shift(-1) > data['Close']).astype(int)
-            
-            # Drop rows with NaN in important ML fields
-            data.dropna(subset=['RSI', 'MA_20', 'MA_50', 'MACD', 'Volume_Ratio', 'Next_Day_Up'], inplace=True)
+            # Add technical indicators
+            data = self.add_indicators(data)
             
             print(f"✅ {symbol}: {len(data)} data points")
             return data
@@ -58,3 +198,70 @@ class DataFetcher:
         except Exception as e:
             print(f"❌ Error fetching {symbol}: {str(e)}")
             return None
+    
+    def _fetch_timed(self, symbol, start_date, end_date, data=None, indicators=True, started=None):
+        if started is not None:
+            started[symbol] = time.monotonic()
+        timer = self.instrumentation.symbol('fetch', symbol) if self.instrumentation else nullcontext()
+        with timer:
+            return self.fetch_stock_data(symbol, start_date, end_date, data, indicators)
+    
+    def fetch_many(self, symbols, start_date, end_date):
+        """Fetch many symbols concurrently, returning {symbol: data or None} in input order
+        
+        The universe is first downloaded in one batch when FETCH_BATCH is set;
+        anything the batch missed is fetched per symbol on a bounded thread
+        pool. Each symbol fails independently and is given at most
+        FETCH_SYMBOL_TIMEOUT seconds from when a worker starts on it; symbols
+        still queued once every round of workers could have used its full
+        timeout are given up too. Indicators are then added for the whole
+        universe at once (see add_indicators_many).
+        """
+        prefetched = self.download_many(symbols, start_date, end_date) if config.FETCH_BATCH else {}
+        prefetched = {s: d for s, d in prefetched.items() if d is not None and not d.empty}
+        
+        workers = max(1, min(config.FETCH_WORKERS, len(symbols)))
+        pool = ThreadPoolExecutor(max_workers=workers)
+        started = {}
+        futures = {
+            symbol: pool.submit(self._fetch_timed, symbol, start_date, end_date,
+                                prefetched.get(symbol), False, started)
+            for symbol in symbols
+        }
+        
+        timeout = config.FETCH_SYMBOL_TIMEOUT
+        deadline = time.monotonic() + timeout * math.ceil(len(symbols) / workers)
+        pending = dict(futures)
+        timed_out = set()
+        while pending:
+            now = time.monotonic()
+            for symbol in list(pending):
+                if now >= deadline or (symbol in started and now - started[symbol] >= timeout):
+                    timed_out.add(symbol)
+                    del pending[symbol]
+            if not pending:
+                break
+            
+            # Wake for the next completion or expiry; poll so tasks started meanwhile are timed too
+            expiry = min([deadline] + [started[s] + timeout for s in pending if s in started])
+            done, _ = wait(pending.values(), timeout=min(max(expiry - now, 0), 1.0),
+                           return_when=FIRST_COMPLETED)
+            pending = {s: f for s, f in pending.items() if f not in done}
+        
+        results = {}
+        for symbol, future in futures.items():
+            if symbol in timed_out:
+                print(f"❌ Timed out fetching {symbol}")
+                results[symbol] = None
+            else:
+                results[symbol] = future.result()
+        
+        # Don't block on timed-out downloads
+        pool.shutdown(wait=False, cancel_futures=True)
+        
+        results = self.add_indicators_many(results)
+        
+        for symbol, data in results.items():
+            if data is not None:
+                print(f"✅ {symbol}: {len(data)} data points")
+        return results
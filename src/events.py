@@ -0,0 +1,145 @@
+# src/events.py
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from src.market_store import utc_ns
+
+EVENT_SIGNALS = {'ENTER': 'BUY', 'EXIT': 'SELL'}
+
+
+def next_position(position, signal):
+    """Long-only position (1 long, 0 flat) after one bar's signal"""
+    if signal == 1:
+        return 1
+    if signal == -1:
+        return 0
+    return position
+
+
+def position_array(signal, initial=0):
+    """Vectorized next_position over a signal history, starting from initial"""
+    signal = np.asarray(signal)
+    # Each bar inherits the most recent non-zero signal
+    last = np.where(signal != 0, np.arange(len(signal)), -1)
+    np.maximum.accumulate(last, out=last)
+    before_first = 1 if initial else -1
+    latest = np.where(last >= 0, signal[np.maximum(last, 0)], before_first)
+    return (latest == 1).astype(np.int8)
+
+
+def event_array(signal, initial=0):
+    """1 where a position is entered, -1 where it is exited, 0 elsewhere"""
+    position = position_array(signal, initial)
+    return np.diff(position, prepend=np.int8(1 if initial else 0)).astype(np.int8)
+
+
+class SignalStateStore:
+    """Last known position and bar time per symbol, persisted as JSON"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.states = {}
+        if path:
+            try:
+                with open(path) as f:
+                    self.states = json.load(f)
+            except (FileNotFoundError, ValueError):
+                self.states = {}
+
+    def get(self, symbol):
+        return self.states.get(symbol)
+
+    def set(self, symbol, position, as_of):
+        self.states[symbol] = {'position': int(position), 'as_of': str(pd.Timestamp(as_of))}
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(self.states, f, indent=2)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"⚠️  Could not save signal state: {str(e)}")
+
+
+class EventTracker:
+    """Turn per-bar BUY/SELL labels into ENTER/EXIT position transitions
+
+    A persistent RSI/MA condition labels every bar, but only the bar where
+    the long-only position actually changes is an event. scan() handles
+    whole histories vectorized, resuming after the last bar recorded in the
+    state store; update() advances one symbol by one bar for live polling.
+    A symbol seen for the first time is initialized silently from its
+    history, so only a transition on its latest bar is reported.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or SignalStateStore()
+
+    def _event(self, symbol, event, date, row):
+        return {
+            'Symbol': symbol,
+            'Date': date,
+            'Event': event,
+            'Signal': EVENT_SIGNALS[event],
+            'Price': row['Close'],
+            'RSI': row['RSI'],
+            'MA_20': row['MA_20'],
+            'MA_50': row['MA_50']
+        }
+
+    def scan(self, stock_data):
+        """Events on bars newer than each symbol's stored state; updates the store"""
+        events = []
+        for symbol, data in stock_data.items():
+            if data is None or len(data) == 0:
+                continue
+
+            signal = data['Signal'].to_numpy()
+            stamps = utc_ns(data.index)
+            state = self.store.get(symbol)
+
+            if state is None:
+                position = position_array(signal)
+                start = len(signal) - 1
+                initial = position[-2] if len(signal) > 1 else 0
+            else:
+                as_of = pd.Timestamp(state['as_of'])
+                as_of = as_of.tz_convert('UTC').tz_localize(None) if as_of.tz is not None else as_of
+                start = int(np.searchsorted(stamps, as_of.as_unit('ns').value, side='right'))
+                initial = state['position']
+
+            new = signal[start:]
+            if len(new) == 0:
+                continue
+
+            transitions = event_array(new, initial)
+            for i in np.flatnonzero(transitions):
+                row = data.iloc[start + i]
+                events.append(self._event(symbol, 'ENTER' if transitions[i] == 1 else 'EXIT',
+                                          data.index[start + i], row))
+
+            self.store.set(symbol, position_array(new, initial)[-1], data.index[-1])
+        return events
+
+    def prime(self, symbol, signal, as_of):
+        """Initialize an unseen symbol's position from its latest signal, silently"""
+        if self.store.get(symbol) is None:
+            self.store.set(symbol, next_position(0, signal), as_of)
+
+    def update(self, symbol, signal, as_of):
+        """Apply one new bar's signal; returns 'ENTER', 'EXIT' or None"""
+        state = self.store.get(symbol)
+        previous = state['position'] if state else 0
+        position = next_position(previous, signal)
+        self.store.set(symbol, position, as_of)
+        if position == previous:
+            return None
+        return 'ENTER' if position else 'EXIT'
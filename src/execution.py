@@ -0,0 +1,82 @@
+# src/execution.py
+
+import numpy as np
+import config
+
+BUY = 1
+SELL = -1
+
+
+class ExecutionModel:
+    """How backtest orders fill: fill bar and price, slippage, fees and liquidity
+
+    fill='close' fills at the signal bar's close (the original behaviour);
+    'next_open' fills at the following bar's open, so a signal can't trade
+    on the price that produced it (or at its close when the open is
+    missing). Slippage moves every fill slippage_bps
+    against the order. Fees per order are brokerage (brokerage_pct of the
+    traded value, capped at brokerage_max) plus STT (stt_pct, both sides).
+    max_volume_pct caps an entry at that share of the fill bar's Volume.
+    All methods take arrays, so costs for every trade are computed at once.
+    The defaults from config are frictionless and reproduce exact-close fills.
+    """
+
+    def __init__(self, fill=None, slippage_bps=None, brokerage_pct=None, brokerage_max=None,
+                 stt_pct=None, max_volume_pct=None):
+        self.fill = fill or config.EXECUTION_FILL
+        self.slippage_bps = config.SLIPPAGE_BPS if slippage_bps is None else slippage_bps
+        self.brokerage_pct = config.BROKERAGE_PCT if brokerage_pct is None else brokerage_pct
+        self.brokerage_max = config.BROKERAGE_MAX if brokerage_max is None else brokerage_max
+        self.stt_pct = config.STT_PCT if stt_pct is None else stt_pct
+        self.max_volume_pct = config.MAX_VOLUME_PCT if max_volume_pct is None else max_volume_pct
+        if self.fill not in ('close', 'next_open'):
+            raise ValueError(f"Unknown fill {self.fill!r} (use 'close' or 'next_open')")
+
+    @property
+    def needs_open(self):
+        return self.fill == 'next_open'
+
+    @property
+    def needs_volume(self):
+        return bool(self.max_volume_pct)
+
+    @property
+    def charges_fees(self):
+        return bool(self.brokerage_pct or self.stt_pct)
+
+    @property
+    def fee_rate(self):
+        """Upper bound on fees as a fraction of traded value (used for sizing)"""
+        return self.brokerage_pct + self.stt_pct
+
+    def fill_bars(self, bars):
+        """Bar where an order signalled on each of bars executes"""
+        return bars + 1 if self.fill == 'next_open' else bars
+
+    def base_prices(self, close, open_=None):
+        """Reference price per bar, before slippage; a NaN open falls back to the bar's close"""
+        close = np.asarray(close, dtype=np.float64)
+        if self.fill != 'next_open':
+            return close
+        open_ = np.asarray(open_, dtype=np.float64)
+        return np.where(np.isnan(open_), close, open_)
+
+    def fill_prices(self, base, side):
+        """Prices after slippage: higher for buys, lower for sells"""
+        if not self.slippage_bps:
+            return base
+        return base * (1 + side * self.slippage_bps / 10_000)
+
+    def fees(self, notional):
+        """Brokerage plus STT for orders of the given traded values"""
+        brokerage = notional * self.brokerage_pct
+        if self.brokerage_max is not None:
+            brokerage = np.minimum(brokerage, self.brokerage_max)
+        return brokerage + notional * self.stt_pct
+
+    def capacity(self, volume):
+        """Most shares an entry may take on each bar, or None when uncapped"""
+        if not self.max_volume_pct or volume is None:
+            return None
+        limit = np.floor(np.asarray(volume, dtype=np.float64) * self.max_volume_pct)
+        return np.where(np.isnan(limit), np.inf, limit)
@@ -0,0 +1,75 @@
+# src/features.py
+
+from collections import OrderedDict, namedtuple
+import numpy as np
+from src.model_registry import fingerprint_arrays
+
+# A model input: its name, the data columns it reads and a vectorized function
+# taking those columns as float64 arrays (in order) and returning one array
+Feature = namedtuple('Feature', ['name', 'inputs', 'func'])
+
+
+def column(name):
+    """Feature that passes a data column through unchanged"""
+    return Feature(name, (name,), lambda values: values)
+
+
+# Add new model inputs here; training, batch inference and backtests all
+# read features through FeaturePipeline so there is only one definition
+FEATURES = [
+    column('RSI'),
+    column('MACD'),
+    column('Volume_Ratio'),
+    column('MA_20'),
+    column('MA_50'),
+    Feature('MA_diff', ('MA_20', 'MA_50'), lambda ma20, ma50: ma20 - ma50),
+    Feature('RSI_MA', ('RSI', 'MA_50'), lambda rsi, ma50: rsi / (ma50 + 1)),
+    Feature('MACD_Squared', ('MACD',), lambda macd: macd ** 2),
+    Feature('Volatility', ('MA_20', 'MA_50'), lambda ma20, ma50: np.abs(ma20 - ma50) / (ma50 + 1)),
+]
+
+
+class FeaturePipeline:
+    """Compute model features into one contiguous matrix, cached per input fingerprint"""
+
+    def __init__(self, features=None, dtype=np.float64, cache_size=512):
+        self.features = features or FEATURES
+        self.dtype = dtype
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    @property
+    def names(self):
+        return [feature.name for feature in self.features]
+
+    @property
+    def inputs(self):
+        """Data columns the pipeline reads, in first-use order"""
+        return list(dict.fromkeys(name for feature in self.features for name in feature.inputs))
+
+    def transform(self, data):
+        """Return an (n_rows, n_features) C-contiguous matrix for a frame or column mapping"""
+        columns = {name: np.asarray(data[name], dtype=np.float64) for name in self.inputs}
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+
+        matrix = np.empty((n_rows, len(self.features)), dtype=self.dtype)
+        for i, feature in enumerate(self.features):
+            matrix[:, i] = feature.func(*(columns[name] for name in feature.inputs))
+        return matrix
+
+    def transform_cached(self, key, data):
+        """transform() memoized on (key, fingerprint of the input columns)"""
+        # Fingerprint the stored values as-is; transform() does the float64 cast
+        columns = [np.asarray(data[name]) for name in self.inputs]
+        cache_key = (key, fingerprint_arrays(*columns))
+
+        if cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            return self._cache[cache_key]
+
+        matrix = self.transform(dict(zip(self.inputs, columns)))
+        matrix.setflags(write=False)
+        self._cache[cache_key] = matrix
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return matrix
@@ -0,0 +1,307 @@
+# src/indicators.py
+
+import math
+import numpy as np
+
+
+class RollingMean:
+    """O(1) rolling mean matching pandas Series.rolling(window).mean() bit for bit
+
+    Mirrors pandas' roll_mean kernel: Kahan-compensated running sum with
+    separate compensation for added and removed values, and the same
+    clamping rules for all-positive / all-negative windows.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = [0.0] * window
+        self.count = 0
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_run = 0
+        self.prev_value = None
+
+    def _add(self, val):
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            self.same_run = self.same_run + 1 if val == self.prev_value else 1
+            self.prev_value = val
+
+    def _remove(self, val):
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct -= 1
+
+    def update(self, val):
+        """Add one value and return the mean of the last `window` values"""
+        val = float(val)
+        if self.count == 0:
+            self.prev_value = val
+        if self.count >= self.window:
+            self._remove(self.values[self.count % self.window])
+        self.values[self.count % self.window] = val
+        self.count += 1
+        self._add(val)
+
+        if self.nobs < self.window:
+            return math.nan
+        if self.same_run >= self.nobs:
+            return self.prev_value
+        result = self.sum_x / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+
+class EWMean:
+    """O(1) exponentially weighted mean matching pandas Series.ewm(...).mean()
+
+    Follows pandas' ewma recurrence for both adjust=True (normalised weights,
+    the pandas default) and adjust=False.
+    """
+
+    def __init__(self, span=None, alpha=None, adjust=True, min_periods=0):
+        if alpha is None:
+            com = (span - 1) / 2.0
+            alpha = 1.0 / (1.0 + com)
+        self.alpha = alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.weighted = None
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, val):
+        """Add one value and return the current weighted mean"""
+        val = float(val)
+        is_observation = val == val
+        self.nobs += is_observation
+
+        if self.weighted is None:
+            self.weighted = val
+        elif self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+            if is_observation:
+                new_wt = 1.0 if self.adjust else self.alpha
+                if self.weighted != val:
+                    self.weighted = self.old_wt * self.weighted + new_wt * val
+                    self.weighted /= self.old_wt + new_wt
+                self.old_wt = self.old_wt + new_wt if self.adjust else 1.0
+        elif is_observation:
+            self.weighted = val
+
+        return self.weighted if self.nobs >= self.min_periods else math.nan
+
+
+class RSIState:
+    """O(1) RSI; SMA-smoothed like DataFetcher.calculate_rsi or Wilder-smoothed"""
+
+    def __init__(self, period=14, wilder=False):
+        if wilder:
+            self.gain = EWMean(alpha=1.0 / period, adjust=False, min_periods=period)
+            self.loss = EWMean(alpha=1.0 / period, adjust=False, min_periods=period)
+        else:
+            self.gain = RollingMean(period)
+            self.loss = RollingMean(period)
+        self.prev_close = math.nan
+
+    def update(self, close):
+        close = float(close)
+        delta = close - self.prev_close
+        self.prev_close = close
+
+        # Same values as delta.where(delta > 0, 0) and -delta.where(delta < 0, 0)
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-(delta if delta < 0 else 0.0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(gain) / np.float64(loss)
+            return float(100 - (100 / (1 + rs)))
+
+
+class IndicatorEngine:
+    """Streaming version of DataFetcher.add_indicators for one symbol
+
+    Seed it with the history DataFetcher fetched, then feed one bar at a
+    time; every value equals what the batch pandas code would produce for
+    the same series.
+    """
+
+    def __init__(self, rsi_period=14, wilder=False, ma_periods=(20, 50)):
+        self.rsi = RSIState(rsi_period, wilder=wilder)
+        self.ma = {period: RollingMean(period) for period in sorted(set(ma_periods) | {20, 50})}
+        self.ema_12 = EWMean(span=12)
+        self.ema_26 = EWMean(span=26)
+        self.volume_ma = RollingMean(20)
+        self.latest = None
+
+    def seed(self, data):
+        """Feed a raw OHLCV frame bar by bar; returns the last indicator values"""
+        for close, volume in zip(data['Close'].to_numpy(dtype=np.float64),
+                                 data['Volume'].to_numpy(dtype=np.float64)):
+            self.update(close, volume)
+        return self.latest
+
+    def update(self, close, volume):
+        """Consume one bar and return its indicators"""
+        volume_ma = self.volume_ma.update(volume)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = float(np.float64(volume) / np.float64(volume_ma))
+
+        self.latest = {
+            'Close': float(close),
+            'Volume': float(volume),
+            'RSI': self.rsi.update(close),
+            'MACD': self.ema_12.update(close) - self.ema_26.update(close),
+            'Volume_MA': volume_ma,
+            'Volume_Ratio': volume_ratio
+        }
+        for period, ma in self.ma.items():
+            self.latest[f'MA_{period}'] = ma.update(close)
+        return self.latest
+
+    @property
+    def ready(self):
+        """True once every indicator has a full window (same rows add_indicators keeps)"""
+        return self.latest is not None and not any(
+            math.isnan(self.latest[k]) for k in ('RSI', 'MA_20', 'MA_50', 'MACD', 'Volume_Ratio')
+        )
+
+
+# Array kernels: whole histories at once, on 1-D (bars) or 2-D (bars x symbols)
+# float arrays, computed along axis 0. They agree with the pandas methods they
+# replace up to floating point rounding.
+
+def rolling_mean(values, window):
+    """Series.rolling(window).mean() from one cumulative sum (NaN until full, or if any NaN in window)"""
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    total = np.cumsum(np.where(missing, 0.0, values), axis=0)
+    total[window:] = total[window:] - total[:-window]
+
+    result = total / window
+    result[:window - 1] = np.nan
+    if missing.any():
+        bad = np.cumsum(missing, axis=0)
+        bad[window:] = bad[window:] - bad[:-window]
+        result[bad > 0] = np.nan
+    return result
+
+
+def _decay_sum(values, decay):
+    """s[t] = decay * s[t-1] + values[t] along axis 0, without a Python loop per bar
+
+    Within a block s[t] = decay**t * cumsum(values[i] / decay**i); blocks are
+    kept short enough that decay**-i stays far from overflow.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.empty_like(values)
+    block = max(1, int(300 / -math.log10(decay))) if 0 < decay < 1 else len(values)
+    powers = decay ** np.arange(min(block, len(values)), dtype=np.float64)
+    powers = powers.reshape((-1,) + (1,) * (values.ndim - 1))
+
+    carry = None
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        scale = powers[:len(chunk)]
+        sums = np.cumsum(chunk / scale, axis=0) * scale
+        if carry is not None:
+            sums += carry * (scale * decay)
+        result[start:start + block] = sums
+        carry = sums[-1]
+    return result
+
+
+def ewm_mean(values, span=None, alpha=None, adjust=True, min_periods=0):
+    """Series.ewm(span=..., alpha=..., adjust=...).mean(), NaN handled as pandas does
+
+    A NaN bar adds no observation but still ages the earlier weights
+    (ignore_na=False), so the output carries the last value through it and
+    min_periods counts observations, not bars.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+
+    missing = np.isnan(values)
+    if missing.any():
+        if not adjust:
+            # pandas renormalises the weights after every observation; use it directly
+            import pandas as pd
+            return pd.DataFrame(values.reshape(len(values), -1)).ewm(
+                alpha=alpha, adjust=False, min_periods=min_periods).mean().to_numpy().reshape(values.shape)
+        # Weighted sum of observations over the sum of their weights
+        with np.errstate(invalid='ignore'):
+            result = _decay_sum(np.where(missing, 0.0, values), decay) / _decay_sum(~missing, decay)
+        result[np.cumsum(~missing, axis=0) < max(min_periods, 1)] = np.nan
+        return result
+
+    if adjust:
+        # Weights decay**i normalised by their sum, (1 - decay**(t+1)) / alpha
+        steps = np.arange(1, len(values) + 1, dtype=np.float64).reshape((-1,) + (1,) * (values.ndim - 1))
+        result = _decay_sum(values, decay) * alpha / (1.0 - decay ** steps)
+    else:
+        # y[0] = x[0], y[t] = decay * y[t-1] + alpha * x[t]
+        scaled = values * alpha
+        scaled[:1] = values[:1]
+        result = _decay_sum(scaled, decay)
+
+    result[:max(min_periods, 1) - 1] = np.nan
+    return result
+
+
+def rsi(close, period=14, wilder=False):
+    """RSI of a close array; simple-average gains/losses like DataFetcher.calculate_rsi or Wilder's smoothing"""
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.zeros_like(close)
+    delta[1:] = close[1:] - close[:-1]
+    # NaN deltas count as zero, as delta.where(delta > 0, 0) does
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+
+    if wilder:
+        gain = ewm_mean(gain, alpha=1.0 / period, adjust=False, min_periods=period)
+        loss = ewm_mean(loss, alpha=1.0 / period, adjust=False, min_periods=period)
+    else:
+        # Sums of non-negative values can't be negative; drop cumsum rounding below zero
+        gain = np.maximum(rolling_mean(gain, period), 0.0)
+        loss = np.maximum(rolling_mean(loss, period), 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + gain / loss))
+
+
+def indicator_arrays(close, volume, ma_periods=(20, 50), rsi_period=14, wilder=False):
+    """Every column DataFetcher.add_indicators adds, as {name: array} for 1-D or 2-D input"""
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+
+    columns = {'RSI': rsi(close, rsi_period, wilder)}
+    for period in dict.fromkeys((20, 50) + tuple(ma_periods)):
+        columns[f'MA_{period}'] = rolling_mean(close, period)
+    columns['MACD'] = ewm_mean(close, span=12) - ewm_mean(close, span=26)
+    columns['Volume_MA'] = rolling_mean(volume, 20)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        columns['Volume_Ratio'] = volume / columns['Volume_MA']
+
+    # Next bar closes higher; the last bar has no next bar and counts as down
+    next_up = np.zeros(close.shape, dtype=np.int64)
+    next_up[:-1] = close[1:] > close[:-1]
+    columns['Next_Day_Up'] = next_up
+    return columns
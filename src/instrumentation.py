@@ -0,0 +1,128 @@
+# src/instrumentation.py
+
+import os
+import sys
+import json
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Process memory high-water mark in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def stage(name=None):
+    """Decorator timing a method as a pipeline stage via self.instrumentation"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.instrumentation.stage(name or method.__name__):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Instrumentation:
+    """Wall/CPU timers, memory high-water marks and counters for one run
+
+    Stages and per-symbol work are timed with context managers, counters
+    are free-form, and everything ends up in a JSON run report. With
+    profile=True the run is also recorded with cProfile.
+    """
+
+    def __init__(self, profile=False):
+        self.started_at = datetime.now()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.stages = {}
+        self.symbols = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.profiler = None
+
+        if profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    @contextmanager
+    def stage(self, name):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0})
+            entry['calls'] += 1
+            entry['wall_s'] += time.perf_counter() - wall
+            entry['cpu_s'] += time.process_time() - cpu
+            entry['peak_rss_mb'] = peak_rss_mb()
+
+    @contextmanager
+    def symbol(self, stage_name, symbol):
+        """Time one symbol's share of a stage (thread-safe; CPU is per thread)"""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add_symbol_timing(stage_name, symbol,
+                                   time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def add_symbol_timing(self, stage_name, symbol, wall_s, cpu_s):
+        with self.lock:
+            self.symbols.setdefault(stage_name, {})[symbol] = {'wall_s': wall_s, 'cpu_s': cpu_s}
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self, **extra):
+        """Machine-readable summary of the run so far"""
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'wall_s': time.perf_counter() - self.wall_start,
+            'cpu_s': time.process_time() - self.cpu_start,
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': self.stages,
+            'symbols': self.symbols,
+            'counters': self.counters,
+            **extra
+        }
+
+    def write_report(self, directory, **extra):
+        """Write run_<timestamp>.json (plus .prof when profiling); returns the report path"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = self.started_at.strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(directory, f"run_{stamp}.json")
+
+        if self.profiler is not None:
+            self.profiler.disable()
+            profile_path = os.path.join(directory, f"run_{stamp}.prof")
+            self.profiler.dump_stats(profile_path)
+            extra['profile'] = profile_path
+
+        with open(path, 'w') as f:
+            json.dump(self.report(**extra), f, indent=2, default=str)
+        return path
+
+    def print_summary(self):
+        """Print per-stage timings"""
+        print("\n⏱️  PERFORMANCE:")
+        for name, entry in self.stages.items():
+            rss = f", peak {entry['peak_rss_mb']:.0f} MB" if entry.get('peak_rss_mb') else ""
+            print(f"   • {name}: {entry['wall_s']:.2f}s wall, {entry['cpu_s']:.2f}s CPU{rss}")
+        for name, value in self.counters.items():
+            print(f"   • {name}: {value}")
@@ -0,0 +1,247 @@
+# src/live.py
+
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import config
+from src.data_cache import OHLCV_COLUMNS, YahooSource
+from src.indicators import IndicatorEngine
+from src.strategy import signal_array
+from src.events import EVENT_SIGNALS, EventTracker, SignalStateStore
+
+
+class YahooLiveSource:
+    """Poll recent intraday bars from Yahoo Finance
+
+    The newest bar Yahoo returns is usually still forming, so only bars older
+    than it are handed out.
+    """
+
+    def __init__(self, source=None, interval=None, lookback_days=None):
+        self.source = source or YahooSource()
+        self.interval = interval or config.LIVE_INTERVAL
+        self.lookback_days = lookback_days or config.LIVE_LOOKBACK_DAYS
+        self.last_seen = {}
+
+    def _download(self, symbols, days):
+        start = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        end = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
+        if hasattr(self.source, 'history_batch'):
+            return self.source.history_batch(symbols, start, end, interval=self.interval)
+        return {s: self.source.history(s, start, end, interval=self.interval) for s in symbols}
+
+    def _completed(self, symbol, data):
+        if data is None or len(data) < 2:
+            return None
+        data = data[OHLCV_COLUMNS].iloc[:-1]
+        if symbol in self.last_seen:
+            data = data[data.index > self.last_seen[symbol]]
+        if len(data):
+            self.last_seen[symbol] = data.index[-1]
+        return data
+
+    def seed(self, symbols):
+        """History to warm up the indicators: {symbol: OHLCV frame}"""
+        frames = self._download(symbols, self.lookback_days)
+        return {s: self._completed(s, frames.get(s)) for s in symbols}
+
+    def poll(self, symbols):
+        """Bars completed since the previous call: {symbol: OHLCV frame}"""
+        frames = self._download(symbols, 1)
+        return {s: self._completed(s, frames.get(s)) for s in symbols}
+
+
+class ReplaySource:
+    """Replay <directory>/<symbol>.csv bar files as if they were arriving live"""
+
+    def __init__(self, directory, seed_bars=None, bars_per_poll=1):
+        self.directory = directory
+        self.seed_bars = config.LIVE_SEED_BARS if seed_bars is None else seed_bars
+        self.bars_per_poll = bars_per_poll
+        self.frames = {}
+        self.position = {}
+
+    def _frame(self, symbol):
+        if symbol not in self.frames:
+            path = os.path.join(self.directory, f"{symbol}.csv")
+            data = pd.read_csv(path, index_col=0, parse_dates=True) if os.path.exists(path) else None
+            self.frames[symbol] = data[OHLCV_COLUMNS] if data is not None else None
+        return self.frames[symbol]
+
+    @property
+    def exhausted(self):
+        return all(data is None or self.position.get(s, 0) >= len(data)
+                   for s, data in self.frames.items())
+
+    def seed(self, symbols):
+        history = {}
+        for symbol in symbols:
+            data = self._frame(symbol)
+            self.position[symbol] = min(self.seed_bars, len(data)) if data is not None else 0
+            history[symbol] = data.iloc[:self.position[symbol]] if data is not None else None
+        return history
+
+    def poll(self, symbols):
+        bars = {}
+        for symbol in symbols:
+            data = self._frame(symbol)
+            if data is None:
+                continue
+            start = self.position.get(symbol, 0)
+            self.position[symbol] = min(start + self.bars_per_poll, len(data))
+            bars[symbol] = data.iloc[start:self.position[symbol]]
+        return bars
+
+
+class LiveTrader:
+    """Long-running polling loop over intraday bars
+
+    Each cycle feeds only the new bars into per-symbol IndicatorEngines,
+    re-evaluates the strategy signal bar by bar for the symbols that got
+    bars, scores just those symbols with one MLPredictor.predict_batch call
+    and alerts only on ENTER/EXIT position changes (positions persist in
+    LIVE_SIGNAL_STATE_PATH). Cycle times are tracked against a latency budget.
+    """
+
+    def __init__(self, symbols, source, ml_predictor, telegram_bot,
+                 poll_seconds=None, latency_budget=None, tracker=None):
+        self.symbols = list(symbols)
+        self.source = source
+        self.ml_predictor = ml_predictor
+        self.telegram_bot = telegram_bot
+        self.poll_seconds = config.LIVE_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.latency_budget = config.LIVE_LATENCY_BUDGET if latency_budget is None else latency_budget
+        self.tracker = tracker or EventTracker(SignalStateStore(config.LIVE_SIGNAL_STATE_PATH))
+
+        self.engines = {}
+        self.signals = {}
+        self.cycle_times = deque(maxlen=1000)
+        self.cycles = 0
+        self.over_budget = 0
+        self.bars_processed = 0
+        self.alerts_sent = 0
+
+    def _signal(self, latest):
+        return int(signal_array(
+            latest['RSI'],
+            latest[f'MA_{config.MA_SHORT_PERIOD}'],
+            latest[f'MA_{config.MA_LONG_PERIOD}'],
+            config.RSI_BUY_THRESHOLD, config.RSI_SELL_THRESHOLD
+        ))
+
+    def _signal_info(self, symbol):
+        latest = self.engines[symbol].latest
+        return {
+            'Symbol': symbol,
+            'Price': latest['Close'],
+            'RSI': latest['RSI'],
+            'MA_20': latest['MA_20'],
+            'MA_50': latest['MA_50'],
+            'Signal': {1: 'BUY', -1: 'SELL'}.get(self.signals[symbol], 'HOLD')
+        }
+
+    def seed(self):
+        """Warm up one indicator engine per symbol from the source's history"""
+        print(f"🔥 Seeding live indicators for {len(self.symbols)} stocks...")
+        periods = (config.MA_SHORT_PERIOD, config.MA_LONG_PERIOD)
+        for symbol, history in self.source.seed(self.symbols).items():
+            engine = IndicatorEngine(wilder=config.RSI_WILDER, ma_periods=periods)
+            if history is not None and len(history):
+                engine.seed(history)
+                self.bars_processed += len(history)
+            self.engines[symbol] = engine
+            self.signals[symbol] = self._signal(engine.latest) if engine.latest else 0
+            if history is not None and len(history):
+                self.tracker.prime(symbol, self.signals[symbol], history.index[-1])
+
+    def poll_once(self):
+        """Run one cycle; returns the signal dicts for symbols that got new bars"""
+        start = time.perf_counter()
+
+        changed = []
+        events = []
+        for symbol, bars in self.source.poll(self.symbols).items():
+            if bars is None or len(bars) == 0 or symbol not in self.engines:
+                continue
+            engine = self.engines[symbol]
+            event = None
+            for when, close, volume in zip(bars.index, bars['Close'].to_numpy(dtype=np.float64),
+                                           bars['Volume'].to_numpy(dtype=np.float64)):
+                engine.update(close, volume)
+                self.signals[symbol] = self._signal(engine.latest)
+                event = self.tracker.update(symbol, self.signals[symbol], when) or event
+            self.bars_processed += len(bars)
+
+            info = self._signal_info(symbol)
+            changed.append(info)
+            if event:
+                # Most recent transition within this poll
+                events.append((info, event))
+
+        # Re-score only the symbols whose bars changed, in one batch
+        ready = [info for info in changed if self.engines[info['Symbol']].ready]
+        if ready:
+            latest = pd.DataFrame([self.engines[i['Symbol']].latest for i in ready],
+                                  index=[i['Symbol'] for i in ready])
+            predictions = self.ml_predictor.predict_batch(latest)
+            if predictions is not None:
+                for info in ready:
+                    row = predictions.loc[info['Symbol']]
+                    if pd.notna(row['ML_Prediction']):
+                        info['ML_Prediction'] = row['ML_Prediction']
+                        info['ML_Confidence'] = row['ML_Confidence']
+
+        alerts = [dict(info, Event=event, Signal=EVENT_SIGNALS[event]) for info, event in events]
+        if alerts:
+            self.telegram_bot.send_signal_alerts(alerts)
+            self.alerts_sent += len(alerts)
+            self.tracker.store.save()
+
+        elapsed = time.perf_counter() - start
+        self.cycle_times.append(elapsed)
+        self.cycles += 1
+        if elapsed > self.latency_budget:
+            self.over_budget += 1
+            print(f"⚠️ Live cycle took {elapsed:.2f}s (budget {self.latency_budget:.2f}s)")
+        return changed
+
+    def metrics(self):
+        """Cycle-time and throughput statistics so far"""
+        times = np.array(self.cycle_times) if self.cycle_times else np.zeros(1)
+        return {
+            'cycles': self.cycles,
+            'bars_processed': self.bars_processed,
+            'alerts_sent': self.alerts_sent,
+            'over_budget': self.over_budget,
+            'last_cycle': float(times[-1]),
+            'mean_cycle': float(times.mean()),
+            'p95_cycle': float(np.percentile(times, 95)),
+            'max_cycle': float(times.max())
+        }
+
+    def run(self, max_cycles=None):
+        """Poll until interrupted, max_cycles is reached or a replay runs out"""
+        if not self.engines:
+            self.seed()
+
+        print(f"🟢 Live mode: polling every {self.poll_seconds}s (Ctrl+C to stop)")
+        try:
+            while max_cycles is None or self.cycles < max_cycles:
+                started = time.monotonic()
+                changed = self.poll_once()
+                if changed:
+                    m = self.metrics()
+                    print(f"⏱️  Cycle {self.cycles}: {len(changed)} updated, "
+                          f"{m['last_cycle'] * 1000:.1f} ms (p95 {m['p95_cycle'] * 1000:.1f} ms)")
+                if getattr(self.source, 'exhausted', False):
+                    break
+                time.sleep(max(0.0, self.poll_seconds - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            print("\n🛑 Live mode stopped")
+        finally:
+            self.tracker.store.save()
+
+        return self.metrics()
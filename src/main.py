@@ -4,63 +4,211 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import argparse
 from datetime import datetime
+from functools import cached_property
+import numpy as np
+import pandas as pd
 import config
+from src.instrumentation import Instrumentation, stage
 from src.data_fetcher import DataFetcher
-from src.strategy import TradingStrategy
-from src.ml_model import MLPredictor
-from src.sheets_manager import SheetsManager
-from src.telegram_bot import TelegramBot
+from src.strategy import TradingStrategy, gate_signals
+from src.market_store import MarketStore
+from src.events import EventTracker, SignalStateStore
+from src.portfolio import PortfolioBacktester
 
 class AlgoTradingSystem:
-    """Main Algo Trading System Controller"""
+    """Main Algo Trading System Controller
+    
+    The ML model (sklearn), Google Sheets (gspread) and Telegram (requests)
+    components are created, and their modules imported, on first use, so
+    commands that don't need them never pay for them.
+    """
     
     def __init__(self):
         print("🚀 Initializing Algo Trading System")
         print("=" * 50)
         
         # Initialize components
-        self.data_fetcher = DataFetcher()
+        self.instrumentation = Instrumentation(profile=config.PROFILE)
+        self.data_fetcher = DataFetcher(instrumentation=self.instrumentation)
         self.strategy = TradingStrategy()
-        self.ml_predictor = MLPredictor()
-        self.sheets_manager = SheetsManager()
-        self.telegram_bot = TelegramBot()
+        self.event_tracker = EventTracker(SignalStateStore(config.SIGNAL_STATE_PATH))
         
         # Data storage
         self.stock_data = {}
         self.backtest_results = {}
+        self.gated_results = {}
+        self.portfolio_result = None
         self.current_signals = []
+        self.signal_events = []
         
         print("✅ System initialized\n")
     
+    @cached_property
+    def ml_predictor(self):
+        from src.ml_model import MLPredictor
+        return MLPredictor()
+    
+    @cached_property
+    def sheets_manager(self):
+        from src.sheets_manager import SheetsManager
+        return SheetsManager()
+    
+    @cached_property
+    def telegram_bot(self):
+        from src.telegram_bot import TelegramBot
+        return TelegramBot()
+    
+    def _started(self, component):
+        """Whether a lazily created component has been used yet"""
+        return component in self.__dict__
+    
+    @stage()
     def fetch_all_data(self):
         """Fetch data for all stocks"""
         print("📊 STEP 1: DATA INGESTION")
         print("-" * 30)
         
-        for symbol in config.STOCKS:
-            data = self.data_fetcher.fetch_stock_data(symbol, config.START_DATE, config.END_DATE)
+        fetched = self.data_fetcher.fetch_many(config.STOCKS, config.START_DATE, config.END_DATE)
+        for symbol, data in fetched.items():
             if data is not None:
                 # Generate trading signals
-                data_with_signals = self.strategy.generate_signals(data, symbol)
-                self.stock_data[symbol] = data_with_signals
+                with self.instrumentation.symbol('signals', symbol):
+                    self.strategy.generate_signals(data, symbol)
+        
+        # Pack every symbol into compact columnar arrays; later stages read views
+        self.stock_data = MarketStore.from_frames(fetched)
+        del fetched
         
-        print(f"✅ Loaded data for {len(self.stock_data)} stocks\n")
+        print(f"✅ Loaded data for {len(self.stock_data)} stocks "
+              f"({self.stock_data.nbytes / 2 ** 20:.1f} MB)\n")
         return len(self.stock_data) > 0
     
+    @stage()
     def run_backtests(self):
         """Run backtests for all stocks"""
         print("🎯 STEP 2: STRATEGY BACKTESTING")
         print("-" * 35)
         
-        for symbol, data in self.stock_data.items():
-            result = self.strategy.backtest(data, symbol)
+        results = self.strategy.backtest_many(
+            self.stock_data, timer=lambda symbol: self.instrumentation.symbol('backtest', symbol)
+        )
+        for symbol, result in results.items():
             if result:
                 self.backtest_results[symbol] = result
         
         print(f"✅ Completed backtests for {len(self.backtest_results)} stocks\n")
         return len(self.backtest_results) > 0
     
+    @stage()
+    def run_ml_gated_backtest(self, threshold=None):
+        """Backtest with BUYs filtered by walk-forward ML predictions, next to the plain strategy
+        
+        Both versions run over the same out-of-sample bars (those with a
+        prediction), so the difference is what the model adds.
+        """
+        print("🧪 ML-GATED BACKTEST")
+        print("-" * 21)
+        
+        threshold = config.ML_GATE_THRESHOLD if threshold is None else threshold
+        probabilities = self.ml_predictor.walk_forward_probabilities(self.stock_data)
+        
+        self.gated_results = {}
+        for symbol, prob_up in probabilities.items():
+            scored = np.flatnonzero(~np.isnan(prob_up))
+            if not scored.size:
+                print(f"⚠️ {symbol}: no out-of-sample predictions")
+                continue
+            data = self.stock_data[symbol].iloc[scored[0]:]
+            prob_up = prob_up[scored[0]:]
+            gated = gate_signals(data['Signal'].to_numpy(), prob_up, threshold)
+            self.gated_results[symbol] = {
+                'from': data.index[0],
+                'plain': self.strategy.backtest(data, symbol),
+                'gated': self.strategy.backtest(data, f"{symbol} (ML-gated)", signal=gated)
+            }
+        
+        self.print_gated_comparison(threshold)
+        return len(self.gated_results) > 0
+    
+    def print_gated_comparison(self, threshold):
+        """Side-by-side plain vs ML-gated results per symbol"""
+        def cells(result):
+            if not result:
+                return "0 trades"
+            return (f"{result['total_trades']} trades, {result['win_rate']:.0%} win, "
+                    f"{result['total_return']:+.2f}%")
+        
+        print(f"\n📊 Plain vs ML-gated (BUY needs ML_Prob_Up >= {threshold:.0%}):")
+        totals = {'plain': 0.0, 'gated': 0.0}
+        for symbol, results in self.gated_results.items():
+            print(f"   • {symbol} (from {pd.Timestamp(results['from']).date()}): "
+                  f"plain {cells(results['plain'])} | gated {cells(results['gated'])}")
+            for name in totals:
+                totals[name] += results[name]['total_pnl'] if results[name] else 0.0
+        print(f"   • Total P&L: plain ₹{totals['plain']:.2f} | gated ₹{totals['gated']:.2f}")
+        if not config.ML_FIXED_PARAMS and self.ml_predictor.tuner.cached():
+            print("   ℹ️  Fold models reuse hyperparameters searched on the full training window, "
+                  "so early folds may look better than they would live")
+        print()
+    
+    @stage()
+    def run_archive_backtest(self, start=None, end=None, symbols=None):
+        """Backtest long histories from the memory-mapped archive, one symbol at a time"""
+        print("🗄️  ARCHIVE BACKTEST")
+        print("-" * 21)
+        
+        from src.archive import MarketArchive
+        
+        archive = MarketArchive()
+        if not archive.symbols:
+            print(f"⚠️  Archive {archive.directory} is empty - import data with src/archive.py\n")
+            return {}
+        
+        def prepare(data, symbol):
+            data = self.data_fetcher.add_indicators(data)
+            return self.strategy.generate_signals(data, symbol)
+        
+        # Only the symbol being backtested is materialized
+        results = {}
+        for symbol, data in archive.view(start, end, symbols, prepare).items():
+            with self.instrumentation.symbol('archive_backtest', symbol):
+                result = self.strategy.backtest(data, symbol)
+            if result:
+                results[symbol] = result
+        
+        print(f"✅ Completed archive backtests for {len(results)} stocks\n")
+        return results
+    
+    @stage()
+    def run_portfolio_backtest(self):
+        """Backtest all stocks together with one shared cash pool"""
+        print("💼 PORTFOLIO BACKTEST")
+        print("-" * 23)
+        
+        self.portfolio_result = PortfolioBacktester().run(self.stock_data)
+        print()
+        return self.portfolio_result is not None
+    
+    @stage()
+    def run_parameter_sweep(self, top=10):
+        """Grid search strategy parameters over the loaded stocks"""
+        print("🔍 PARAMETER SWEEP")
+        print("-" * 20)
+        
+        from src.sweep import ParameterSweep
+        
+        results = ParameterSweep().run(self.stock_data)
+        if results.empty:
+            print("⚠️  No parameter sets evaluated\n")
+            return results
+        
+        print(results.head(top).to_string(index=False))
+        print(f"✅ Ranked {len(results)} parameter sets\n")
+        return results
+    
+    @stage()
     def train_ml_model(self):
         """Train machine learning model"""
         print("🤖 STEP 3: MACHINE LEARNING")
@@ -75,6 +223,17 @@ class AlgoTradingSystem:
             print("⚠️  ML training failed\n")
             return False
     
+    @stage()
+    def tune_ml_model(self):
+        """Search ML hyperparameters afresh and refit the model with them"""
+        print("🔎 ML HYPERPARAMETER TUNING")
+        print("-" * 29)
+        
+        model = self.ml_predictor.train_model(self.stock_data, retune=True)
+        print("✅ Hyperparameters tuned and model refitted\n" if model else "⚠️  ML tuning failed\n")
+        return model is not None
+    
+    @stage()
     def analyze_current_market(self):
         """Analyze current market signals"""
         print("📊 STEP 4: CURRENT MARKET ANALYSIS")
@@ -82,35 +241,65 @@ class AlgoTradingSystem:
         
         self.current_signals = self.strategy.get_current_signals(self.stock_data)
         
-        # Add ML predictions
-        for signal in self.current_signals:
-            symbol = signal['Symbol']
-            data = self.stock_data[symbol]
-            latest = data.iloc[-1]
+        # Add ML predictions, scoring every symbol in one batch
+        symbols = [signal['Symbol'] for signal in self.current_signals]
+        if symbols:
+            latest = pd.DataFrame([self.stock_data[symbol].iloc[-1] for symbol in symbols], index=symbols)
+            predictions = self.ml_predictor.predict_batch(latest)
             
-            features = [latest['RSI'], latest['MACD'], latest['Volume_Ratio'], 
-                       latest['MA_20'], latest['MA_50']]
-            
-            ml_result = self.ml_predictor.predict(features)
-            if ml_result:
-                signal['ML_Prediction'] = ml_result['prediction']
-                signal['ML_Confidence'] = ml_result['confidence']
+            if predictions is not None:
+                for signal in self.current_signals:
+                    ml_result = predictions.loc[signal['Symbol']]
+                    if pd.notna(ml_result['ML_Prediction']):
+                        signal['ML_Prediction'] = ml_result['ML_Prediction']
+                        signal['ML_Confidence'] = ml_result['ML_Confidence']
         
-        # Send Telegram alerts for BUY/SELL signals
-        for signal in self.current_signals:
-            if signal['Signal'] in ['BUY', 'SELL']:
-                self.telegram_bot.send_signal_alert(signal)
+        # Only position changes since the last run are actionable
+        self.signal_events = self.event_tracker.scan(self.stock_data)
+        latest = {signal['Symbol']: signal for signal in self.current_signals}
+        for event in self.signal_events:
+            current = latest.get(event['Symbol'])
+            if current and 'ML_Prediction' in current and event['Date'] == self.stock_data[event['Symbol']].index[-1]:
+                event['ML_Prediction'] = current['ML_Prediction']
+                event['ML_Confidence'] = current['ML_Confidence']
         
-        print(f"✅ Analyzed {len(self.current_signals)} signals\n")
+        # Send Telegram alerts for new ENTER/EXIT events (one coalesced message)
+        self.telegram_bot.send_signal_alerts(self.signal_events)
+        self.event_tracker.store.save()
+        
+        print(f"✅ Analyzed {len(self.current_signals)} signals, {len(self.signal_events)} new events\n")
         return True
     
+    def run_live(self, source=None, max_cycles=None):
+        """Poll intraday bars, update signals incrementally and alert on changes"""
+        print("🟢 LIVE INTRADAY MODE")
+        print("-" * 23)
+        
+        from src.live import LiveTrader, YahooLiveSource
+        
+        source = source or YahooLiveSource(self.data_fetcher.source)
+        trader = LiveTrader(config.STOCKS, source, self.ml_predictor, self.telegram_bot)
+        
+        try:
+            metrics = trader.run(max_cycles)
+        finally:
+            self.telegram_bot.close()
+        
+        print(f"✅ {metrics['cycles']} cycles, {metrics['bars_processed']} bars, "
+              f"{metrics['alerts_sent']} alerts")
+        print(f"⏱️  Cycle time: mean {metrics['mean_cycle'] * 1000:.1f} ms, "
+              f"p95 {metrics['p95_cycle'] * 1000:.1f} ms, max {metrics['max_cycle'] * 1000:.1f} ms, "
+              f"{metrics['over_budget']} over budget\n")
+        return metrics
+    
+    @stage()
     def log_to_sheets(self):
         """Log all results to Google Sheets"""
         print("📝 STEP 5: GOOGLE SHEETS LOGGING")
         print("-" * 35)
         
-        # Log signals
-        self.sheets_manager.log_signals(self.current_signals)
+        # Log new ENTER/EXIT events
+        self.sheets_manager.log_signals(self.signal_events)
         
         # Log backtest results
         self.sheets_manager.log_backtest_results(self.backtest_results)
@@ -128,9 +317,37 @@ class AlgoTradingSystem:
         
         self.sheets_manager.log_analytics(analytics_data)
         
+        # One append_rows request per worksheet
+        self.sheets_manager.flush()
+        
         print("✅ Results logged to Google Sheets\n")
         return True
     
+    def write_run_report(self, success):
+        """Record network counters and write the JSON run report"""
+        self.instrumentation.count('yahoo_requests', self.data_fetcher.network_calls)
+        if self._started('sheets_manager'):
+            self.instrumentation.count('sheets_api_calls', self.sheets_manager.api_calls)
+        if self._started('telegram_bot'):
+            self.instrumentation.count('telegram_sent', self.telegram_bot.sent_count)
+            self.instrumentation.count('telegram_dropped', self.telegram_bot.dropped_count)
+        self.instrumentation.print_summary()
+        
+        if not config.RUN_REPORT_DIR:
+            return None
+        try:
+            path = self.instrumentation.write_report(
+                config.RUN_REPORT_DIR,
+                success=success,
+                stocks=len(config.STOCKS),
+                period={'start': config.START_DATE, 'end': config.END_DATE}
+            )
+            print(f"📄 Run report: {path}")
+            return path
+        except Exception as e:
+            print(f"⚠️  Could not write run report: {str(e)}")
+            return None
+    
     def print_summary(self):
         """Print comprehensive system summary"""
         print("=" * 60)
@@ -156,11 +373,22 @@ class AlgoTradingSystem:
             total_trades += result['total_trades']
             total_pnl += result['total_pnl']
         
+        # Portfolio Results (shared capital)
+        if self.portfolio_result:
+            portfolio = self.portfolio_result
+            print(f"\n💼 PORTFOLIO (shared ₹{config.INITIAL_CAPITAL:,} capital):")
+            print(f"   • Trades: {portfolio['total_trades']} ({portfolio['win_rate']:.1%} win rate)")
+            print(f"   • Final Equity: ₹{portfolio['final_equity']:.2f}")
+            print(f"   • Return: {portfolio['total_return']:.2f}%")
+            print(f"   • Max Drawdown: {portfolio['max_drawdown']:.2f}%")
+        
         # ML Results
-        if self.ml_predictor.accuracy:
+        if self._started('ml_predictor') and self.ml_predictor.accuracy:
             print(f"\n🤖 MACHINE LEARNING:")
             print(f"   • Model: Random Forest")
             print(f"   • Accuracy: {self.ml_predictor.accuracy:.1%}")
+            if self.ml_predictor.peak_rss_mb:
+                print(f"   • Peak RSS: {self.ml_predictor.peak_rss_mb:.0f} MB")
         
         # Current Signals
         print(f"\n📊 CURRENT SIGNALS:")
@@ -172,44 +400,95 @@ class AlgoTradingSystem:
                 ml_emoji = "📈" if signal['ML_Prediction'] == 'UP' else "📉"
                 print(f"      {ml_emoji} ML: {signal['ML_Prediction']} ({signal['ML_Confidence']:.1%})")
         
+        # New position changes since the last run
+        print(f"\n🔔 NEW EVENTS:")
+        if not self.signal_events:
+            print("   • None")
+        for event in self.signal_events:
+            emoji = "🟢" if event['Event'] == 'ENTER' else "🔴"
+            print(f"   {emoji} {event['Symbol']}: {event['Event']} ({event['Signal']}) "
+                  f"at ₹{event['Price']:.2f} on {pd.Timestamp(event['Date']).date()}")
+        
         # Overall Performance
         print(f"\n💰 OVERALL PERFORMANCE:")
         print(f"   • Total Trades: {total_trades}")
         print(f"   • Total P&L: ₹{total_pnl:.2f}")
+        total_costs = sum([r.get('total_costs', 0) for r in self.backtest_results.values()])
+        if total_costs:
+            print(f"   • Gross P&L: ₹{total_pnl + total_costs:.2f} (₹{total_costs:.2f} fees and slippage)")
         print(f"   • Status: {'🟢 PROFITABLE' if total_pnl > 0 else '🔴 LOSS'}")
         
         # Google Sheets URL
-        sheet_url = self.sheets_manager.get_sheet_url()
+        sheet_url = self.sheets_manager.get_sheet_url() if self._started('sheets_manager') else None
         if sheet_url:
             print(f"\n📋 Google Sheets: {sheet_url}")
         
         print("=" * 60)
     
-    def run(self):
-        """Execute the complete trading pipeline"""
+    def run_tool(self, command, top=10, source=None, max_cycles=None, start=None, end=None):
+        """One of the single-purpose commands: 'tune', 'sweep', 'live' or 'archive'"""
+        if command == 'tune':
+            return bool(self.fetch_all_data() and self.tune_ml_model())
+        if command == 'sweep':
+            return bool(self.fetch_all_data() and not self.run_parameter_sweep(top).empty)
+        if command == 'live':
+            return self.run_live(source, max_cycles)['cycles'] > 0
+        if command == 'archive':
+            return bool(self.run_archive_backtest(start, end))
+        raise ValueError(f"Unknown command {command!r}")
+    
+    def run(self, command='full', ml_gate=None, **options):
+        """Execute the trading pipeline
+        
+        command picks the steps: 'backtest' (backtests only), 'train'
+        (ML training only), 'signals' (current signals, alerts and Sheets
+        logging with the saved model) or 'full' (everything). ml_gate adds
+        the ML-gated backtest to 'backtest' and 'full' runs (default
+        ML_GATE_BACKTEST). 'tune', 'sweep', 'live' and 'archive' run
+        run_tool with options instead. Every command ends with the stage
+        timings and run report.
+        """
+        ml_gate = config.ML_GATE_BACKTEST if ml_gate is None else ml_gate
+        success = False
         try:
+            if command in ('tune', 'sweep', 'live', 'archive'):
+                success = self.run_tool(command, **options)
+                return success
+            
             print("🚀 STARTING ALGO TRADING SYSTEM")
             print(f"📅 Period: {config.START_DATE} to {config.END_DATE}")
             print(f"📈 Stocks: {', '.join(config.STOCKS)}")
             print("=" * 50)
             
+            # Sheets OAuth overlaps with the data download instead of delaying startup
+            if command in ('signals', 'full'):
+                self.sheets_manager.connect_async()
+            
             # Execute all steps
             if not self.fetch_all_data():
                 print("❌ Data fetching failed")
                 return False
             
-            if not self.run_backtests():
-                print("❌ Backtesting failed") 
-                return False
+            if command in ('backtest', 'full'):
+                if not self.run_backtests():
+                    print("❌ Backtesting failed") 
+                    return False
+                
+                self.run_portfolio_backtest()
             
-            self.train_ml_model()  # Optional, continues if fails
+            if command in ('train', 'full'):
+                self.train_ml_model()  # Optional, continues if fails
             
-            self.analyze_current_market()
+            if ml_gate and command in ('backtest', 'full'):
+                self.run_ml_gated_backtest()
             
-            self.log_to_sheets()
+            if command in ('signals', 'full'):
+                self.analyze_current_market()
+                
+                self.log_to_sheets()
             
             # Send Telegram summary
-            if self.telegram_bot.enabled:
+            if command == 'full' and self.telegram_bot.enabled:
                 total_pnl = sum([r['total_pnl'] for r in self.backtest_results.values()])
                 active_signals = len([s for s in self.current_signals if s['Signal'] != 'HOLD'])
                 
@@ -229,6 +508,7 @@ class AlgoTradingSystem:
             print(f"\n✅ SYSTEM COMPLETED SUCCESSFULLY!")
             print(f"🕐 Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             
+            success = True
             return True
             
         except Exception as e:
@@ -236,14 +516,57 @@ class AlgoTradingSystem:
             print(f"\n❌ {error_msg}")
             self.telegram_bot.send_error(error_msg)
             return False
+        
+        finally:
+            # Deliver alerts still queued in the background dispatcher
+            if self._started('telegram_bot'):
+                self.telegram_bot.close()
+            self.write_run_report(success)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Algo Trading System with ML & Automation')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    full = commands.add_parser('full', help='backtest, train, signals, Sheets and Telegram (default)')
+    backtest = commands.add_parser('backtest', help='fetch data and backtest only')
+    for command in (full, backtest):
+        command.add_argument('--ml-gate', action='store_true', default=None,
+                             help='also backtest with BUYs filtered by walk-forward ML predictions')
+    commands.add_parser('train', help='fetch data and train the ML model')
+    commands.add_parser('signals', help='current signals and alerts with the saved model')
+    commands.add_parser('tune', help='re-search ML hyperparameters and refit (run periodically)')
+    sweep = commands.add_parser('sweep', help='grid search strategy parameters')
+    sweep.add_argument('--top', type=int, default=10)
+    live = commands.add_parser('live', help='poll intraday bars and alert on changes')
+    live.add_argument('--max-cycles', type=int)
+    live.add_argument('--replay', metavar='DIR', help='replay <DIR>/<symbol>.csv instead of Yahoo')
+    archive = commands.add_parser('archive', help='backtest a date range from the bar archive')
+    archive.add_argument('--start')
+    archive.add_argument('--end')
+    
+    args = parser.parse_args(argv)
+    args.command = args.command or 'full'
+    return args
 
-def main():
+def main(argv=None):
     """Main function"""
+    args = parse_args(argv)
+    
     print("🏁 Algo Trading System with ML & Automation")
     print("=" * 50)
     
+    options = {}
+    if args.command == 'sweep':
+        options = {'top': args.top}
+    elif args.command == 'live':
+        from src.live import ReplaySource
+        
+        options = {'source': ReplaySource(args.replay) if args.replay else None,
+                   'max_cycles': args.max_cycles}
+    elif args.command == 'archive':
+        options = {'start': args.start, 'end': args.end}
+    
     system = AlgoTradingSystem()
-    success = system.run()
+    success = system.run(args.command, getattr(args, 'ml_gate', None), **options)
     
     if success:
         print("\n🎉 Execution completed successfully!")
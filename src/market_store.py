@@ -0,0 +1,134 @@
+# src/market_store.py
+
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+import config
+
+# Fields that only ever hold small integers
+INT8_FIELDS = ('Signal', 'Next_Day_Up')
+# Share counts exceed float32's 2**24 exact-integer range; always stored as float64
+FLOAT64_FIELDS = ('Volume', 'Volume_MA')
+
+
+def field_dtype(name, dtype):
+    """Storage dtype of a field when floats are stored as dtype"""
+    if name in INT8_FIELDS:
+        return np.dtype(np.int8)
+    if name in FLOAT64_FIELDS:
+        return np.dtype(np.float64)
+    return np.dtype(dtype)
+
+
+def utc_ns(index):
+    """DatetimeIndex as naive-UTC int64 nanoseconds"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.as_unit('ns').asi8
+
+
+class MarketStore(Mapping):
+    """Compact columnar bars for many symbols
+
+    Every field is one contiguous array holding all symbols back to back
+    (float32 by default, float64 for volumes, int8 for signals/targets);
+    symbol j owns rows
+    offsets[j]:offsets[j + 1]. Row timestamps are int32 positions into one
+    shared date index. store[symbol] returns a DataFrame whose columns are
+    read-only views into those arrays, so existing per-symbol code works
+    without copying.
+    """
+
+    def __init__(self, dates, symbols, offsets, date_idx, fields):
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.offsets = offsets
+        self.date_idx = date_idx
+        self.fields = fields
+        self._positions = {symbol: j for j, symbol in enumerate(self.symbols)}
+
+        for values in [self.offsets, self.date_idx, *self.fields.values()]:
+            values.setflags(write=False)
+
+    @classmethod
+    def from_frames(cls, frames, dtype=None):
+        """Pack {symbol: DataFrame} into a store; numeric columns only"""
+        dtype = np.dtype(dtype or config.STORE_DTYPE)
+        frames = {s: data for s, data in frames.items() if data is not None and len(data) > 0}
+        symbols = list(frames)
+
+        columns = {}
+        for data in frames.values():
+            for name in data.columns:
+                if name not in columns and pd.api.types.is_numeric_dtype(data[name]):
+                    columns[name] = field_dtype(name, dtype)
+
+        # Shared date index: sorted union of every symbol's timestamps
+        stamps = [utc_ns(data.index) for data in frames.values()]
+        shared = np.unique(np.concatenate(stamps)) if stamps else np.empty(0, dtype=np.int64)
+        dates = pd.DatetimeIndex(shared.view('M8[ns]'))
+        if symbols:
+            first = pd.DatetimeIndex(frames[symbols[0]].index)
+            if first.tz is not None:
+                dates = dates.tz_localize('UTC').tz_convert(first.tz)
+            dates.name = first.name
+
+        offsets = np.zeros(len(symbols) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(data) for data in frames.values()])
+        total = int(offsets[-1])
+
+        date_idx = np.empty(total, dtype=np.int32)
+        fields = {name: np.empty(total, dtype=field_dtype) for name, field_dtype in columns.items()}
+        for j, (data, ns) in enumerate(zip(frames.values(), stamps)):
+            rows = slice(offsets[j], offsets[j + 1])
+            date_idx[rows] = np.searchsorted(shared, ns)
+            for name, values in fields.items():
+                if name in data:
+                    values[rows] = data[name].to_numpy()
+                else:
+                    values[rows] = 0 if values.dtype == np.int8 else np.nan
+
+        return cls(dates, symbols, offsets, date_idx, fields)
+
+    def rows(self, symbol):
+        j = self._positions[symbol]
+        return slice(self.offsets[j], self.offsets[j + 1])
+
+    def index(self, symbol):
+        return self.dates[self.date_idx[self.rows(symbol)]]
+
+    def column(self, symbol, field):
+        """Read-only view of one field for one symbol"""
+        return self.fields[field][self.rows(symbol)]
+
+    def __getitem__(self, symbol):
+        rows = self.rows(symbol)
+        return pd.DataFrame({name: values[rows] for name, values in self.fields.items()},
+                            index=self.index(symbol), copy=False)
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self._positions
+
+    def n_rows(self):
+        return int(self.offsets[-1])
+
+    @property
+    def nbytes(self):
+        return (self.offsets.nbytes + self.date_idx.nbytes + self.dates.nbytes
+                + sum(values.nbytes for values in self.fields.values()))
+
+    def panel(self, columns):
+        """(dates, symbols, {column: 2-D float64 dates x symbols array}), NaN where not traded"""
+        panel = {c: np.full((len(self.dates), len(self.symbols)), np.nan) for c in columns}
+        for j in range(len(self.symbols)):
+            rows = slice(self.offsets[j], self.offsets[j + 1])
+            for c in columns:
+                panel[c][self.date_idx[rows], j] = self.fields[c][rows]
+        return self.dates, list(self.symbols), panel
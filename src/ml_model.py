@@ -1,102 +1,488 @@
 # # src/ml_model.py
 
+from collections import Counter
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.metrics import accuracy_score
-from sklearn.preprocessing import StandardScaler
 import config
+from src.model_registry import ModelRegistry, fingerprint_arrays, fingerprint_config
+from src.features import FeaturePipeline
+from src.instrumentation import peak_rss_mb
+from src.tuning import HyperparameterTuner, data_profile
+
+PARAM_GRID = {
+    'n_estimators': [100, 150],
+    'max_depth': [5, 10, None],
+    'min_samples_split': [2, 4],
+    'max_features': ['sqrt', 'log2']
+}
+
+def label_dates(dates):
+    """Date each row's Next_Day_Up label is read from: the next bar's (its own on the last bar)"""
+    labels = np.empty_like(dates)
+    labels[:-1] = dates[1:]
+    labels[-1:] = dates[-1:]
+    return labels
+
+
+def walk_forward_folds(dates, labels, valid, folds):
+    """Yield (start, train, test) row masks for each walk-forward fold
+
+    Dates are cut into folds + 1 blocks of similar valid-row counts on whole
+    dates. A fold trains on valid rows whose label date (see label_dates) is
+    before its first date, so the last bar before the boundary - labelled
+    from the first test bar's close - is left out, and tests on its block.
+    """
+    all_dates, counts = np.unique(dates[valid], return_counts=True)
+    cumulative = np.cumsum(counts)
+    cuts = [all_dates[min(np.searchsorted(cumulative, cumulative[-1] * k / (folds + 1)), len(all_dates) - 1)]
+            for k in range(1, folds + 1)]
+    edges = list(dict.fromkeys(cuts)) + [None]
+
+    for start, end in zip(edges[:-1], edges[1:]):
+        train = valid & (labels < start)
+        test = valid & (dates >= start) & ((dates < end) if end is not None else True)
+        yield start, train, test
+
 
 class MLPredictor:
     """ML model using Random Forest"""
 
-    def __init__(self):
+    def __init__(self, registry=None, pipeline=None):
         self.model = None
         self.accuracy = None
         self.scaler = None
+        self.trained_until = None
+        self.data_fingerprint = None
+        self.peak_rss_mb = None
+        self.registry = registry or ModelRegistry(config.ML_MODEL_PATH)
+        self.pipeline = pipeline or FeaturePipeline()
+        settings = {
+            'features': self.pipeline.names,
+            'random_state': config.ML_RANDOM_STATE
+        }
+        # Streaming searches see a sample, not the whole window: stored under their own key
+        self.tuner = HyperparameterTuner(PARAM_GRID, {**settings, 'training': 'in_memory'})
+        self.streaming_tuner = HyperparameterTuner(PARAM_GRID, {**settings, 'training': 'streaming'})
+        self._load_attempted = False
 
-    def train_model(self, stock_data_dict):
-        print("🤖 Training Random Forest Model...")
-        all_features = []
-        all_targets = []
+    def config_fingerprint(self):
+        """Fingerprint of every setting that changes what the model learns"""
+        return fingerprint_config({
+            'features': self.pipeline.names,
+            'feature_dtype': np.dtype(self.pipeline.dtype).name,
+            'param_grid': PARAM_GRID,
+            'test_size': config.ML_TEST_SIZE,
+            'random_state': config.ML_RANDOM_STATE
+        })
+
+    def load(self):
+        """Load the saved model on first use; returns True when a model is ready"""
+        if self.model is not None:
+            return True
+        if self._load_attempted:
+            return False
+        self._load_attempted = True
+
+        bundle = self.registry.load()
+        if bundle is None:
+            return False
+        if bundle.get('config_fingerprint') != self.config_fingerprint():
+            print("⚠️  Saved ML model uses different settings - retraining")
+            return False
+
+        self.model = bundle['model']
+        self.scaler = bundle['scaler']
+        self.accuracy = bundle['accuracy']
+        self.trained_until = bundle['trained_until']
+        self.data_fingerprint = bundle['data_fingerprint']
+        print(f"📦 Loaded ML model trained {bundle['saved_at']}")
+        return True
+
+    def save(self):
+        """Persist the model, scaler and fingerprints through the registry"""
+        try:
+            self.registry.save({
+                'model': self.model,
+                'scaler': self.scaler,
+                'features': self.pipeline.names,
+                'accuracy': self.accuracy,
+                'trained_until': self.trained_until,
+                'data_fingerprint': self.data_fingerprint,
+                'config_fingerprint': self.config_fingerprint()
+            })
+        except Exception as e:
+            print(f"⚠️  Could not save ML model: {str(e)}")
 
+    def _iter_symbols(self, stock_data_dict, cached=True):
+        """Yield (features, targets, dates) of each symbol's valid rows"""
+        required_cols = self.pipeline.inputs + ['Next_Day_Up']
         for symbol, data in stock_data_dict.items():
-            if data is not None:
-                required_cols = ['RSI', 'MACD', 'Volume_Ratio', 'MA_20', 'MA_50', 'Next_Day_Up']
-                if not all(col in data.columns for col in required_cols):
-                    continue
+            if data is None or not all(col in data.columns for col in required_cols):
+                continue
+
+            features = (self.pipeline.transform_cached(symbol, data) if cached
+                        else self.pipeline.transform(data))
+            targets = data['Next_Day_Up'].to_numpy()
 
-                features = data[['RSI', 'MACD', 'Volume_Ratio', 'MA_20', 'MA_50']].copy()
-                targets = data['Next_Day_Up'].copy()
+            valid = ~np.isnan(features).any(axis=1) & ~pd.isna(targets)
+            if valid.any():
+                index = pd.DatetimeIndex(data.index)
+                if index.tz is not None:
+                    index = index.tz_convert(None)
+                yield features[valid], targets[valid], index.to_numpy()[valid]
 
-                # Advanced feature engineering
-                features['MA_diff'] = features['MA_20'] - features['MA_50']
-                features['RSI_MA'] = features['RSI'] / (features['MA_50'] + 1)
-                features['MACD_Squared'] = features['MACD'] ** 2
-                features['Volatility'] = (features['MA_20'] - features['MA_50']).abs() / (features['MA_50'] + 1)
+    def _build_dataset(self, stock_data_dict):
+        """Stack every symbol's features and targets, ordered by date"""
+        all_features = []
+        all_targets = []
+        all_dates = []
 
-                combined = pd.concat([features, targets], axis=1).dropna()
-                if not combined.empty:
-                    all_features.append(combined.iloc[:, :-1])
-                    all_targets.append(combined.iloc[:, -1])
+        for features, targets, dates in self._iter_symbols(stock_data_dict):
+            all_features.append(features)
+            all_targets.append(targets)
+            all_dates.append(dates)
 
         if not all_features:
+            return None, None, None
+
+        X = np.concatenate(all_features)
+        y = np.concatenate(all_targets)
+        dates = np.concatenate(all_dates)
+
+        # Time order across symbols so splits never train on the future
+        order = np.argsort(dates, kind='stable')
+        return X[order], y[order], dates[order]
+
+    def _profile(self, y_train):
+        """Drift profile of the training window the scaler was just fitted on"""
+        return data_profile(self.scaler.mean_, self.scaler.scale_, np.mean(y_train), len(y_train))
+
+    def train_model(self, stock_data_dict, retune=False):
+        """Walk-forward training: fit on older bars, score on the most recent ones
+
+        The last ML_TEST_SIZE of dates is held out. If a forest is already
+        loaded, only bars newer than its last training date are learned, by
+        growing ML_WARM_START_TREES extra trees (warm_start) instead of
+        refitting; the forest is rebuilt once it exceeds ML_MAX_TREES, or
+        when the hyperparameters are due for a new search (see
+        HyperparameterTuner). retune=True forces a search and a refit.
+        """
+        if self._use_streaming(stock_data_dict):
+            return self.train_streaming(stock_data_dict, retune=retune)
+
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.metrics import accuracy_score
+        from sklearn.preprocessing import StandardScaler
+
+        print("🤖 Training Random Forest Model...")
+        X, y, dates = self._build_dataset(stock_data_dict)
+        if X is None:
             print("❌ No training data available")
             return None
 
-        # Concatenate data
-        X = pd.concat(all_features, ignore_index=True)
-        y = pd.concat(all_targets, ignore_index=True)
+        # Skip training entirely when the saved model saw exactly this data
+        fingerprint = fingerprint_arrays(X, y, dates)
+        if self.load() and fingerprint == self.data_fingerprint and not retune:
+            print(f"♻️  Training data unchanged - using saved model ({self.accuracy:.1%} accuracy)")
+            return self.model
 
-        # Normalize with StandardScaler
-        self.scaler = StandardScaler()
-        X_scaled = self.scaler.fit_transform(X)
-
-        # Train/test split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X_scaled, y, test_size=config.ML_TEST_SIZE, random_state=config.ML_RANDOM_STATE
-        )
-
-        # Optimized RandomForest with grid tuning
-        param_grid = {
-            'n_estimators': [100, 150],
-            'max_depth': [5, 10, None],
-            'min_samples_split': [2, 4],
-            'max_features': ['sqrt', 'log2']
-        }
+        # Time-ordered split on whole dates, so no day is in both sets
+        cutoff = dates[int(len(dates) * (1 - config.ML_TEST_SIZE))]
+        train_mask = dates < cutoff
+        if not train_mask.any() or train_mask.all():
+            print("❌ Not enough history for a walk-forward split")
+            return None
+        X_train, y_train = X[train_mask], y[train_mask]
+        X_test, y_test = X[~train_mask], y[~train_mask]
+
+        can_extend = (self.model is not None and self.trained_until is not None and not retune
+                      and self.model.n_estimators + config.ML_WARM_START_TREES <= config.ML_MAX_TREES)
+
+        if can_extend:
+            # Drifted data (or an expired search) calls for new hyperparameters and a refit
+            X_64 = X_train.astype(np.float64)
+            reason = self.tuner.stale_reason(data_profile(X_64.mean(axis=0), X_64.std(axis=0),
+                                                          y_train.mean(), len(y_train)))
+            if reason and not config.ML_FIXED_PARAMS:
+                print(f"🔁 Refitting instead of warm-starting ({reason})")
+                can_extend = False
 
-        grid = GridSearchCV(RandomForestClassifier(random_state=config.ML_RANDOM_STATE),
-                            param_grid, cv=3, n_jobs=-1)
-        grid.fit(X_train, y_train)
-        self.model = grid.best_estimator_
+        if can_extend:
+            new_mask = dates[train_mask] > self.trained_until
+            y_new = y_train[new_mask]
+            # Tiny or single-class batches wait until more bars accumulate
+            if new_mask.sum() >= config.ML_WARM_START_MIN_ROWS and len(np.unique(y_new)) == len(self.model.classes_):
+                # Grow the forest with trees fitted on the new bars only
+                self.model.n_estimators += config.ML_WARM_START_TREES
+                self.model.fit(self.scaler.transform(X_train[new_mask]), y_new)
+                self.trained_until = dates[train_mask][-1]
+                print(f"🌱 Warm-started {config.ML_WARM_START_TREES} trees on {new_mask.sum()} new rows")
+            else:
+                print(f"♻️  Reusing model ({new_mask.sum()} new rows since last training)")
+        else:
+            # Normalize with StandardScaler fitted on the training window only
+            self.scaler = StandardScaler()
+            X_train_scaled = self.scaler.fit_transform(X_train)
 
-        y_pred = self.model.predict(X_test)
+            params = self.tuner.best_params(X_train_scaled, y_train, self._profile(y_train), force=retune)
+            self.model = RandomForestClassifier(random_state=config.ML_RANDOM_STATE,
+                                                warm_start=True, **params)
+            self.model.fit(X_train_scaled, y_train)
+            self.trained_until = dates[train_mask][-1]
+
+        y_pred = self.model.predict(self.scaler.transform(X_test))
         self.accuracy = accuracy_score(y_test, y_pred)
-        print(f"✅ Optimized RF Accuracy: {self.accuracy:.1%}")
+        self.peak_rss_mb = peak_rss_mb()
+        print(f"✅ Walk-forward RF Accuracy: {self.accuracy:.1%} ({len(y_test)} out-of-sample rows"
+              f"{self._rss_note()})")
+
+        self.data_fingerprint = fingerprint
+        self.save()
         return self.model
 
-    def predict(self, features):
-        if self.model is None or self.scaler is None:
+    def _rss_note(self):
+        return f", peak RSS {self.peak_rss_mb:.0f} MB" if self.peak_rss_mb else ""
+
+    def _use_streaming(self, stock_data_dict):
+        """Whether the universe is big enough for chunked training"""
+        if not config.ML_STREAMING_ROWS:
+            return False
+        if hasattr(stock_data_dict, 'n_rows'):
+            rows = stock_data_dict.n_rows()
+        else:
+            rows = sum(len(data) for data in stock_data_dict.values() if data is not None)
+        return rows > config.ML_STREAMING_ROWS
+
+    def _iter_chunks(self, stock_data_dict, keep, chunk_rows):
+        """Yield (X, y, dates) blocks of at least chunk_rows rows (the last may be smaller)
+
+        Rows come from consecutive symbols where keep(dates) is True, so a
+        block is whole symbols end to end, not date order; at most one chunk
+        plus one symbol's rows is held in memory.
+        """
+        X_parts, y_parts, date_parts, size = [], [], [], 0
+        for features, targets, dates in self._iter_symbols(stock_data_dict, cached=False):
+            mask = keep(dates)
+            if not mask.any():
+                continue
+            X_parts.append(features[mask])
+            y_parts.append(targets[mask])
+            date_parts.append(dates[mask])
+            size += int(mask.sum())
+            if size >= chunk_rows:
+                yield np.concatenate(X_parts), np.concatenate(y_parts), np.concatenate(date_parts)
+                X_parts, y_parts, date_parts, size = [], [], [], 0
+        if size:
+            yield np.concatenate(X_parts), np.concatenate(y_parts), np.concatenate(date_parts)
+
+    def train_streaming(self, stock_data_dict, chunk_rows=None, retune=False):
+        """Out-of-core walk-forward training with bounded memory
+
+        Symbols are read in several passes instead of stacking the whole
+        universe: date counts (for the split cutoff and data fingerprint),
+        StandardScaler.partial_fit over the training rows, then the forest is
+        grown chunk by chunk with warm_start - each chunk of ML_CHUNK_ROWS
+        rows adds trees in proportion to its share of the training rows - and
+        finally accuracy is accumulated over the held-out rows. Peak memory
+        follows the chunk size, not the universe size. Hyperparameters are
+        searched on a chunk-sized sample strided across every symbol's
+        training rows and sorted by date, so the search's time-ordered folds
+        never validate on bars older than those they trained on.
+        """
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import StandardScaler
+
+        chunk_rows = chunk_rows or config.ML_CHUNK_ROWS
+        print(f"🤖 Training Random Forest Model (streaming, {chunk_rows:,}-row chunks)...")
+
+        # Pass 1: rows per date and a fingerprint of every symbol's data
+        date_counts = Counter()
+        symbol_prints = []
+        for features, targets, dates in self._iter_symbols(stock_data_dict, cached=False):
+            unique, counts = np.unique(dates, return_counts=True)
+            date_counts.update(dict(zip(unique, counts)))
+            symbol_prints.append(fingerprint_arrays(features, targets, dates))
+        if not date_counts:
+            print("❌ No training data available")
+            return None
+
+        fingerprint = fingerprint_config(symbol_prints)
+        if self.load() and fingerprint == self.data_fingerprint and not retune:
+            print(f"♻️  Training data unchanged - using saved model ({self.accuracy:.1%} accuracy)")
+            return self.model
+
+        # Same whole-date cutoff as the in-memory split
+        all_dates = np.array(sorted(date_counts))
+        cumulative = np.cumsum([date_counts[d] for d in all_dates])
+        total = int(cumulative[-1])
+        cutoff = all_dates[np.searchsorted(cumulative, int(total * (1 - config.ML_TEST_SIZE)), side='right')]
+        n_train = int(cumulative[np.searchsorted(all_dates, cutoff) - 1]) if cutoff > all_dates[0] else 0
+        if n_train == 0 or n_train == total:
+            print("❌ Not enough history for a walk-forward split")
+            return None
+
+        def is_train(dates):
+            return dates < cutoff
+
+        # Pass 2: scaler statistics over the training window only, plus every
+        # stride-th training row as the hyperparameter search sample
+        stride = max(1, -(-n_train // chunk_rows))
+        self.scaler = StandardScaler()
+        y_train = []
+        sample = []
+        for X_chunk, y_chunk, date_chunk in self._iter_chunks(stock_data_dict, is_train, chunk_rows):
+            self.scaler.partial_fit(X_chunk)
+            y_train.append(y_chunk.mean() * len(y_chunk))
+            sample.append((X_chunk[::stride], y_chunk[::stride], date_chunk[::stride]))
+        profile = data_profile(self.scaler.mean_, self.scaler.scale_, sum(y_train) / n_train, n_train)
+
+        # Search on the sample in date order; the stored result is reused until stale
+        X_sample, y_sample, sample_dates = (np.concatenate(parts) for parts in zip(*sample))
+        order = np.argsort(sample_dates, kind='stable')
+        params = self.streaming_tuner.best_params(self.scaler.transform(X_sample[order]), y_sample[order],
+                                                  profile, force=retune)
+        del sample, X_sample, y_sample, sample_dates
+
+        # Pass 3: grow the forest one chunk at a time
+        n_trees = params['n_estimators']
+        self.model = RandomForestClassifier(random_state=config.ML_RANDOM_STATE, warm_start=True, **params)
+        self.model.n_estimators = 0
+        for X_chunk, y_chunk, _ in self._iter_chunks(stock_data_dict, is_train, chunk_rows):
+            X_chunk = self.scaler.transform(X_chunk)
+            if len(np.unique(y_chunk)) < 2:
+                print(f"⚠️  Skipping single-class chunk of {len(y_chunk)} rows")
+                continue
+            self.model.n_estimators += max(1, round(n_trees * len(y_chunk) / n_train))
+            self.model.fit(X_chunk, y_chunk)
+
+        if not hasattr(self.model, 'estimators_'):
+            print("❌ Streaming training produced no model")
+            self.model = None
+            return None
+        self.trained_until = all_dates[all_dates < cutoff][-1]
+
+        # Pass 4: out-of-sample accuracy, chunk by chunk
+        correct = tested = 0
+        for X_chunk, y_chunk, _ in self._iter_chunks(stock_data_dict, lambda d: ~is_train(d), chunk_rows):
+            correct += int((self.model.predict(self.scaler.transform(X_chunk)) == y_chunk).sum())
+            tested += len(y_chunk)
+
+        self.accuracy = correct / tested
+        self.peak_rss_mb = peak_rss_mb()
+        print(f"✅ Walk-forward RF Accuracy: {self.accuracy:.1%} ({tested} out-of-sample rows, "
+              f"{len(self.model.estimators_)} trees{self._rss_note()})")
+
+        self.data_fingerprint = fingerprint
+        self.save()
+        return self.model
+
+    def predict_batch(self, features):
+        """Score many rows with a single predict_proba call
+
+        features is a DataFrame with the pipeline's input columns (RSI, MACD,
+        Volume_Ratio, MA_20, MA_50) or a 2-D array in that column order. Returns a frame aligned to its rows with
+        ML_Prediction ('UP'/'DOWN', missing where inputs are NaN), ML_Confidence
+        and ML_Prob_Up.
+        """
+        if not self.load() or self.scaler is None:
             return None
 
+        if not isinstance(features, pd.DataFrame):
+            inputs = self.pipeline.inputs
+            features = pd.DataFrame(np.asarray(features, dtype=np.float64).reshape(-1, len(inputs)),
+                                    columns=inputs)
+        full = self.pipeline.transform(features)
+        valid = ~np.isnan(full).any(axis=1)
+
+        prediction = np.full(len(full), None, dtype=object)
+        confidence = np.full(len(full), np.nan)
+        prob_up = np.full(len(full), np.nan)
+
+        if valid.any():
+            proba = self.model.predict_proba(self.scaler.transform(full[valid]))
+            labels = self.model.classes_[proba.argmax(axis=1)]
+            prediction[valid] = np.where(labels == 1, 'UP', 'DOWN')
+            confidence[valid] = proba.max(axis=1)
+            up = np.flatnonzero(self.model.classes_ == 1)
+            prob_up[valid] = proba[:, up[0]] if up.size else 0.0
+
+        return pd.DataFrame({
+            'ML_Prediction': prediction,
+            'ML_Confidence': confidence,
+            'ML_Prob_Up': prob_up
+        }, index=features.index)
+
+    def walk_forward_probabilities(self, stock_data_dict, folds=None):
+        """Out-of-sample ML_Prob_Up for every bar: {symbol: array aligned to its rows}
+
+        The universe's dates are cut into folds + 1 blocks of similar row
+        counts. For each block after the first, a fresh forest is fitted on
+        every earlier bar whose label is known before the block starts and
+        scores the whole block - all symbols - with one predict_proba call,
+        so no bar is scored by a model that saw it or anything after it.
+        Bars in the first block (and rows without features) are NaN.
+
+        Uses the cached tuned hyperparameters (or ML_FIXED_PARAMS) rather
+        than searching per fold. That search covered train_model's whole
+        training window, so earlier folds run with settings chosen partly on
+        later data; the forests themselves never see it.
+        """
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import StandardScaler
+
+        folds = folds or config.ML_GATE_FOLDS
+        required_cols = self.pipeline.inputs + ['Next_Day_Up']
+        symbols, lengths, parts, label_parts = [], [], [], []
+        for symbol, data in stock_data_dict.items():
+            if data is None or len(data) == 0 or not all(col in data.columns for col in required_cols):
+                continue
+            index = pd.DatetimeIndex(data.index)
+            if index.tz is not None:
+                index = index.tz_convert(None)
+            symbols.append(symbol)
+            lengths.append(len(data))
+            parts.append((self.pipeline.transform_cached(symbol, data),
+                          data['Next_Day_Up'].to_numpy(), index.to_numpy()))
+            label_parts.append(label_dates(index.to_numpy()))
+
+        probabilities = {symbol: np.full(n, np.nan) for symbol, n in zip(symbols, lengths)}
+        if not parts:
+            return probabilities
+
+        X = np.concatenate([features for features, _, _ in parts])
+        y = np.concatenate([targets for _, targets, _ in parts])
+        dates = np.concatenate([d for _, _, d in parts])
+        valid = ~np.isnan(X).any(axis=1) & ~pd.isna(y)
+        prob_up = np.full(len(X), np.nan)
+
+        params = config.ML_FIXED_PARAMS or (self.tuner.cached() or {}).get('best_params') or {}
+        for start, train, test in walk_forward_folds(dates, np.concatenate(label_parts), valid, folds):
+            if not test.any() or len(np.unique(y[train])) < 2:
+                continue
+
+            scaler = StandardScaler()
+            model = RandomForestClassifier(random_state=config.ML_RANDOM_STATE, n_jobs=-1, **params)
+            model.fit(scaler.fit_transform(X[train]), y[train])
+            proba = model.predict_proba(scaler.transform(X[test]))
+            prob_up[test] = proba[:, list(model.classes_).index(1)] if 1 in model.classes_ else 0.0
+            print(f"🧪 Walk-forward fold from {pd.Timestamp(start).date()}: "
+                  f"{train.sum()} training rows, {test.sum()} scored")
+
+        offsets = np.cumsum([0] + lengths)
+        for j, symbol in enumerate(symbols):
+            probabilities[symbol] = prob_up[offsets[j]:offsets[j + 1]]
+        return probabilities
+
+    def predict(self, features):
+        """Score one [RSI, MACD, Volume_Ratio, MA_20, MA_50] row"""
         try:
-            # Reconstruct all engineered features
-            RSI, MACD, Volume_Ratio, MA_20, MA_50 = features
-            MA_diff = MA_20 - MA_50
-            RSI_MA = RSI / (MA_50 + 1)
-            MACD_Squared = MACD ** 2
-            Volatility = abs(MA_20 - MA_50) / (MA_50 + 1)
-
-            full_features = [RSI, MACD, Volume_Ratio, MA_20, MA_50,
-                             MA_diff, RSI_MA, MACD_Squared, Volatility]
-            scaled = self.scaler.transform([full_features])
-
-            prediction = self.model.predict(scaled)[0]
-            proba = self.model.predict_proba(scaled)[0]
+            result = self.predict_batch([features])
+            if result is None or pd.isna(result['ML_Prediction'].iloc[0]):
+                return None
+
             return {
-                'prediction': 'UP' if prediction == 1 else 'DOWN',
-                'confidence': max(proba)
+                'prediction': result['ML_Prediction'].iloc[0],
+                'confidence': result['ML_Confidence'].iloc[0]
             }
         except Exception as e:
             print(f"❌ Prediction error: {e}")
@@ -0,0 +1,56 @@
+# src/model_registry.py
+
+import os
+import json
+import hashlib
+from datetime import datetime
+import numpy as np
+
+
+def fingerprint_arrays(*arrays):
+    """Stable SHA-1 over the raw bytes, shapes and dtypes of some arrays"""
+    digest = hashlib.sha1()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_config(settings):
+    """SHA-1 of a JSON-serializable settings dict"""
+    return hashlib.sha1(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ModelRegistry:
+    """Persist a trained model bundle (model, scaler, schema, fingerprints) to disk"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return bool(self.path) and os.path.exists(self.path)
+
+    def save(self, bundle):
+        """Write the bundle atomically so a crash never leaves a half-written model"""
+        import joblib
+
+        bundle = dict(bundle, saved_at=datetime.now().isoformat(timespec='seconds'))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = self.path + '.tmp'
+        joblib.dump(bundle, tmp)
+        os.replace(tmp, self.path)
+
+    def load(self):
+        """Return the saved bundle, or None when missing or unreadable"""
+        if not self.exists():
+            return None
+
+        import joblib
+        try:
+            return joblib.load(self.path)
+        except Exception as e:
+            print(f"⚠️  Could not load model from {self.path}: {str(e)}")
+            return None
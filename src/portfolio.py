@@ -0,0 +1,134 @@
+# src/portfolio.py
+
+import numpy as np
+import pandas as pd
+import config
+from src.market_store import MarketStore
+
+
+def align_panel(stock_data, columns):
+    """Align per-symbol frames on a shared date index as (dates x symbols) arrays
+
+    Returns (dates, symbols, {column: 2-D float64 array}); dates a symbol did
+    not trade are NaN.
+    """
+    if isinstance(stock_data, MarketStore):
+        return stock_data.panel(columns)
+    
+    symbols = [s for s, data in stock_data.items() if data is not None and len(data) > 0]
+    if not symbols:
+        return pd.DatetimeIndex([]), [], {c: np.empty((0, 0)) for c in columns}
+
+    dates = stock_data[symbols[0]].index
+    for symbol in symbols[1:]:
+        dates = dates.union(stock_data[symbol].index)
+
+    panel = {c: np.full((len(dates), len(symbols)), np.nan) for c in columns}
+    for j, symbol in enumerate(symbols):
+        data = stock_data[symbol]
+        rows = dates.get_indexer(data.index)
+        for c in columns:
+            panel[c][rows, j] = data[c].to_numpy(dtype=np.float64)
+    return dates, symbols, panel
+
+
+class PortfolioBacktester:
+    """Backtest all symbols together against one shared cash pool
+
+    Each day sells are filled first, then buys are sized at POSITION_SIZE of
+    total portfolio equity and filled in symbol order while cash lasts.
+    Positions are marked to the last known close on days a symbol is missing.
+    """
+
+    def __init__(self, initial_capital=None, position_size=None):
+        self.initial_capital = config.INITIAL_CAPITAL if initial_capital is None else initial_capital
+        self.position_size = config.POSITION_SIZE if position_size is None else position_size
+
+    def run(self, stock_data):
+        """Backtest a dict of frames with Close and Signal columns"""
+        dates, symbols, panel = align_panel(stock_data, ['Close', 'Signal'])
+        if not symbols:
+            return None
+        return self.run_arrays(dates, symbols, panel['Close'], panel['Signal'])
+
+    def run_arrays(self, dates, symbols, close, signal):
+        """Backtest aligned (dates x symbols) Close and Signal arrays"""
+        print(f"🔄 Portfolio backtest: {len(symbols)} stocks x {len(dates)} days...")
+        n_dates, n_symbols = close.shape
+        tradable = ~np.isnan(close)
+        signal = np.where(tradable, np.nan_to_num(signal), 0)
+
+        # Last known price for marking positions to market
+        last_price = pd.DataFrame(close).ffill().to_numpy()
+        last_price = np.nan_to_num(last_price)
+
+        cash = float(self.initial_capital)
+        shares = np.zeros(n_symbols, dtype=np.int64)
+        entry_price = np.zeros(n_symbols)
+        entry_row = np.zeros(n_symbols, dtype=np.int64)
+        equity = np.empty(n_dates)
+        trades = []
+
+        # Only days with an actionable signal need the per-day state update
+        active = (((signal == -1) | (signal == 1)) & tradable).any(axis=1)
+
+        for t in range(n_dates):
+            if active[t]:
+                price = close[t]
+
+                sells = np.flatnonzero((signal[t] == -1) & (shares > 0))
+                for j in sells:
+                    qty = int(shares[j])
+                    revenue = qty * price[j]
+                    cash += revenue
+                    pnl = revenue - qty * entry_price[j]
+                    trades.append({
+                        'Symbol': symbols[j],
+                        'Entry_Date': dates[entry_row[j]],
+                        'Exit_Date': dates[t],
+                        'Entry_Price': entry_price[j],
+                        'Exit_Price': price[j],
+                        'Shares': qty,
+                        'PnL': pnl,
+                        'PnL_Percent': (pnl / (qty * entry_price[j])) * 100
+                    })
+                    shares[j] = 0
+
+                buys = np.flatnonzero((signal[t] == 1) & (shares == 0))
+                if buys.size:
+                    position_value = (cash + shares @ last_price[t]) * self.position_size
+                    qty = np.floor(position_value / price[buys]).astype(np.int64)
+                    for j, q in zip(buys, qty):
+                        cost = q * price[j]
+                        if q > 0 and cash >= cost:
+                            cash -= cost
+                            shares[j] = q
+                            entry_price[j] = price[j]
+                            entry_row[j] = t
+
+            equity[t] = cash + shares @ last_price[t]
+
+        equity_curve = pd.Series(equity, index=dates, name='Equity')
+        total_trades = len(trades)
+        winning_trades = len([t for t in trades if t['PnL'] > 0])
+        peak = np.maximum.accumulate(equity)
+        max_drawdown = float(((equity - peak) / peak).min() * 100) if n_dates else 0.0
+
+        result = {
+            'symbols': symbols,
+            'total_trades': total_trades,
+            'winning_trades': winning_trades,
+            'win_rate': winning_trades / total_trades if total_trades else 0.0,
+            'total_pnl': sum([t['PnL'] for t in trades]),
+            'total_return': ((equity[-1] - self.initial_capital) / self.initial_capital) * 100,
+            'max_drawdown': max_drawdown,
+            'final_equity': equity[-1],
+            'cash': cash,
+            'open_positions': {symbols[j]: int(shares[j]) for j in np.flatnonzero(shares)},
+            'equity_curve': equity_curve,
+            'trades': trades
+        }
+
+        print(f"✅ Portfolio: {total_trades} trades, {result['win_rate']:.1%} win rate, "
+              f"{result['total_return']:.2f}% return, {max_drawdown:.2f}% max drawdown")
+        return result
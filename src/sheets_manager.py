@@ -1,30 +1,62 @@
 # src/sheets_manager.py
 
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import threading
 from datetime import datetime
 import config
 
 class SheetsManager:
-    """Manage Google Sheets integration"""
+    """Manage Google Sheets integration
     
-    def __init__(self):
+    Nothing is imported or opened until the first write (or connect_async()),
+    so runs that never log to Sheets skip gspread and the OAuth round trips.
+    """
+    
+    def __init__(self, client=None):
         self.client = None
         self.spreadsheet = None
-        self.setup_connection()
+        self.api_calls = 0
+        self._connected = False
+        self._connection = None  # background connect thread
+        self._worksheets = None  # title -> worksheet, filled on first use
+        self._pending = {}       # title -> rows waiting for flush()
+        if client is not None:
+            self.setup_connection(client)
+    
+    def connect_async(self):
+        """Start connecting in the background so the first write doesn't wait on OAuth"""
+        if self._connected or self._connection is not None:
+            return
+        self._connection = threading.Thread(target=self.setup_connection, name='sheets-connect', daemon=True)
+        self._connection.start()
     
-    def setup_connection(self):
-        """Setup Google Sheets connection"""
+    def connect(self):
+        """Connect on first use; returns True when Sheets logging is available"""
+        if self._connection is not None:
+            self._connection.join()
+            self._connection = None
+        if not self._connected:
+            self.setup_connection()
+        return self.client is not None
+    
+    def setup_connection(self, client=None):
+        """Setup Google Sheets connection (pass a client to skip OAuth, e.g. a local fake)"""
+        self._connected = True
         try:
-            scope = [
-                'https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive'
-            ]
+            import gspread
             
-            credentials = ServiceAccountCredentials.from_json_keyfile_name(
-                'credentials.json', scope
-            )
-            self.client = gspread.authorize(credentials)
+            if client is None:
+                from oauth2client.service_account import ServiceAccountCredentials
+                
+                scope = [
+                    'https://spreadsheets.google.com/feeds',
+                    'https://www.googleapis.com/auth/drive'
+                ]
+                
+                credentials = ServiceAccountCredentials.from_json_keyfile_name(
+                    'credentials.json', scope
+                )
+                client = gspread.authorize(credentials)
+            self.client = client
             
             # Open or create spreadsheet
             try:
@@ -49,85 +81,98 @@ class SheetsManager:
             print("   Google Sheets logging will be disabled")
             self.client = None
     
+    def _worksheet(self, title, rows, cols, headers):
+        """Cached worksheet lookup; a new worksheet gets its header row queued"""
+        if self._worksheets is None:
+            # One metadata request instead of a lookup per call
+            self.api_calls += 1
+            self._worksheets = {ws.title: ws for ws in self.spreadsheet.worksheets()}
+        
+        if title not in self._worksheets:
+            self.api_calls += 1
+            self._worksheets[title] = self.spreadsheet.add_worksheet(title=title, rows=rows, cols=cols)
+            self._pending.setdefault(title, []).insert(0, headers)
+        return self._worksheets[title]
+    
+    def _queue(self, title, rows, cols, headers, new_rows):
+        """Buffer rows for a worksheet until flush()"""
+        self._worksheet(title, rows, cols, headers)
+        self._pending.setdefault(title, []).extend(new_rows)
+    
+    def flush(self):
+        """Write all buffered rows with one append_rows request per worksheet"""
+        if not self.connect():
+            return
+        
+        for title in list(self._pending):
+            rows = self._pending[title]
+            if not rows:
+                continue
+            try:
+                self.api_calls += 1
+                self._worksheets[title].append_rows(rows)
+                del self._pending[title]
+                print(f"✅ {len(rows)} rows written to '{title}'")
+            except Exception as e:
+                print(f"❌ Error writing to '{title}': {str(e)}")
+    
     def log_signals(self, signals):
-        """Log current signals to Trade Log sheet"""
-        if not self.client:
+        """Queue current signals for the Trade Log sheet"""
+        if not self.connect():
             return
         
         try:
-            # Get or create Trade Log worksheet
-            try:
-                ws = self.spreadsheet.worksheet('Trade Log')
-            except gspread.WorksheetNotFound:
-                ws = self.spreadsheet.add_worksheet(title='Trade Log', rows=1000, cols=10)
-                headers = ['Date', 'Symbol', 'Signal', 'Price', 'RSI', 'MA_20', 'MA_50']
-                ws.append_row(headers)
-            
-            # Log each signal
-            for signal in signals:
-                if signal['Signal'] in ['BUY', 'SELL']:  # Only log actionable signals
-                    row = [
-                        datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        signal['Symbol'],
-                        signal['Signal'],
-                        f"{signal['Price']:.2f}",
-                        f"{signal['RSI']:.2f}",
-                        f"{signal['MA_20']:.2f}",
-                        f"{signal['MA_50']:.2f}"
-                    ]
-                    ws.append_row(row)
+            headers = ['Date', 'Symbol', 'Signal', 'Price', 'RSI', 'MA_20', 'MA_50']
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
-            print("✅ Signals logged to Google Sheets")
+            rows = [
+                [
+                    now,
+                    signal['Symbol'],
+                    signal['Signal'],
+                    f"{signal['Price']:.2f}",
+                    f"{signal['RSI']:.2f}",
+                    f"{signal['MA_20']:.2f}",
+                    f"{signal['MA_50']:.2f}"
+                ]
+                for signal in signals
+                if signal['Signal'] in ['BUY', 'SELL']  # Only log actionable signals
+            ]
+            self._queue('Trade Log', 1000, 10, headers, rows)
             
         except Exception as e:
             print(f"❌ Error logging signals: {str(e)}")
     
     def log_backtest_results(self, results_dict):
-        """Log backtest results to Summary P&L sheet"""
-        if not self.client:
+        """Queue backtest results for the Summary P&L sheet"""
+        if not self.connect():
             return
         
         try:
-            # Get or create Summary worksheet
-            try:
-                ws = self.spreadsheet.worksheet('Summary P&L')
-            except gspread.WorksheetNotFound:
-                ws = self.spreadsheet.add_worksheet(title='Summary P&L', rows=100, cols=8)
-                headers = ['Symbol', 'Total_Trades', 'Win_Rate', 'Total_PnL', 'Total_Return']
-                ws.append_row(headers)
-            
-            # Log results for each stock
-            for symbol, result in results_dict.items():
-                if result:
-                    row = [
-                        result['symbol'],
-                        result['total_trades'],
-                        f"{result['win_rate']:.1%}",
-                        f"₹{result['total_pnl']:.2f}",
-                        f"{result['total_return']:.2f}%"
-                    ]
-                    ws.append_row(row)
-            
-            print("✅ Backtest results logged to Google Sheets")
+            headers = ['Symbol', 'Total_Trades', 'Win_Rate', 'Total_PnL', 'Total_Return']
+            rows = [
+                [
+                    result['symbol'],
+                    result['total_trades'],
+                    f"{result['win_rate']:.1%}",
+                    f"₹{result['total_pnl']:.2f}",
+                    f"{result['total_return']:.2f}%"
+                ]
+                for result in results_dict.values()
+                if result
+            ]
+            self._queue('Summary P&L', 100, 8, headers, rows)
             
         except Exception as e:
             print(f"❌ Error logging backtest results: {str(e)}")
     
     def log_analytics(self, analytics_data):
-        """Log analytics to Win Ratio sheet"""
-        if not self.client:
+        """Queue analytics for the Win Ratio sheet"""
+        if not self.connect():
             return
         
         try:
-            # Get or create Win Ratio worksheet
-            try:
-                ws = self.spreadsheet.worksheet('Win Ratio')
-            except gspread.WorksheetNotFound:
-                ws = self.spreadsheet.add_worksheet(title='Win Ratio', rows=100, cols=6)
-                headers = ['Date', 'Total_Signals', 'Buy_Signals', 'Sell_Signals', 'ML_Accuracy']
-                ws.append_row(headers)
-            
-            # Log analytics
+            headers = ['Date', 'Total_Signals', 'Buy_Signals', 'Sell_Signals', 'ML_Accuracy']
             row = [
                 datetime.now().strftime('%Y-%m-%d'),
                 analytics_data.get('total_signals', 0),
@@ -135,9 +180,7 @@ class SheetsManager:
                 analytics_data.get('sell_signals', 0),
                 analytics_data.get('ml_accuracy', 'N/A')
             ]
-            ws.append_row(row)
-            
-            print("✅ Analytics logged to Google Sheets")
+            self._queue('Win Ratio', 100, 6, headers, [row])
             
         except Exception as e:
             print(f"❌ Error logging analytics: {str(e)}")
@@ -1,83 +1,146 @@
 # # src/strategy.py
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 import pandas as pd
 import numpy as np
 import config
+from src.backtest_engine import simulate_long_only, simulate_many
+from src.execution import ExecutionModel, BUY, SELL
+
+def signal_array(rsi, ma_short, ma_long, buy_threshold, sell_threshold):
+    """Vectorized signal rule on NumPy arrays (0: Hold, 1: Buy, -1: Sell)
+    
+    Buy: RSI < buy_threshold AND short MA > long MA
+    Sell: RSI > sell_threshold OR short MA < long MA (sell wins over buy)
+    """
+    buy = (rsi < buy_threshold) & (ma_short > ma_long)
+    sell = (rsi > sell_threshold) | (ma_short < ma_long)
+    return np.where(sell, -1, np.where(buy, 1, 0))
+
+def gate_signals(signal, prob_up, threshold):
+    """Keep BUYs only where the model's up-probability reaches threshold
+    
+    SELLs always pass so exits are never blocked; bars without a
+    prediction (NaN) take no new positions.
+    """
+    signal = np.asarray(signal)
+    with np.errstate(invalid='ignore'):
+        blocked = (signal == 1) & ~(np.asarray(prob_up) >= threshold)
+    return np.where(blocked, 0, signal).astype(signal.dtype)
 
 class TradingStrategy:
     """RSI + Moving Average crossover trading strategy"""
     
-    def __init__(self):
-        pass
+    def __init__(self, execution=None):
+        self.execution = execution or ExecutionModel()
+    
+    def _execution_inputs(self, data):
+        """(open, volume) arrays the execution model needs, None otherwise"""
+        open_ = data['Open'].to_numpy() if self.execution.needs_open else None
+        volume = data['Volume'].to_numpy() if self.execution.needs_volume else None
+        return open_, volume
     
     def generate_signals(self, data, symbol):
-        """Generate buy/sell signals"""
-        signals = data.copy()
-        signals['Signal'] = 0  # 0: Hold, 1: Buy, -1: Sell
-        
-        # Buy: RSI < 30 AND 20-MA > 50-MA (with crossover)
-        buy_condition = (
-            (signals['RSI'] < config.RSI_BUY_THRESHOLD) &
-            (signals['MA_20'] > signals['MA_50']) 
-            #&(signals['MA_20'].shift(1) <= signals['MA_50'].shift(1))
-
-            #(signals['RSI'] < 45) & (signals['MA_20'] > signals['MA_50'])
-        )
+        """Generate buy/sell signals
+        
+        The int8 Signal column is added to data in place (no frame copy).
+        """
+        data['Signal'] = signal_array(
+            data['RSI'].to_numpy(),
+            data[f"MA_{config.MA_SHORT_PERIOD}"].to_numpy(),
+            data[f"MA_{config.MA_LONG_PERIOD}"].to_numpy(),
+            config.RSI_BUY_THRESHOLD, config.RSI_SELL_THRESHOLD
+        ).astype(np.int8)
+        
+        print(f"📈 {symbol}: {data['Signal'].abs().sum()} signals generated")
+        return data
+    
+    def backtest(self, data_with_signals, symbol, signal=None):
+        """Backtest the strategy (signal overrides the Signal column when given)"""
+        print(f"🔄 Backtesting {symbol}...")
         
-        # Sell: RSI > 70 OR 20-MA < 50-MA (with crossover)
-        sell_condition = (
-            (signals['RSI'] > config.RSI_SELL_THRESHOLD) |
-            ((signals['MA_20'] < signals['MA_50'])) 
-            #&(signals['MA_20'].shift(1) >= signals['MA_50'].shift(1)))
-            
-            #(signals['RSI'] > 55) | (signals['MA_20'] < signals['MA_50'])
+        close = data_with_signals['Close'].to_numpy(dtype=np.float64)
+        open_, volume = self._execution_inputs(data_with_signals)
+        simulation = simulate_long_only(
+            close, data_with_signals['Signal'].to_numpy() if signal is None else signal,
+            config.INITIAL_CAPITAL, config.POSITION_SIZE, self.execution, open_, volume
         )
+        return self._summarize(symbol, close, data_with_signals.index, simulation, open_)
+    
+    def backtest_many(self, stock_data, workers=None, timer=None):
+        """Backtest every symbol, in parallel for large universes
+        
+        Only each symbol's Close and Signal arrays are shipped to the process
+        pool; workers return the engine's trade indices and the trade dicts
+        are built here, in input order. Universes under
+        BACKTEST_PARALLEL_MIN_BARS bars run serially, timed per symbol with
+        timer(symbol) when given.
+        """
+        workers = workers or config.BACKTEST_WORKERS or os.cpu_count() or 1
+        frames = {s: data for s, data in stock_data.items() if data is not None and len(data) > 0}
+        total_bars = sum(len(data) for data in frames.values())
+        
+        if workers <= 1 or len(frames) < 2 or total_bars < config.BACKTEST_PARALLEL_MIN_BARS:
+            results = {}
+            for symbol, data in frames.items():
+                with timer(symbol) if timer else nullcontext():
+                    results[symbol] = self.backtest(data, symbol)
+            return results
         
-        signals.loc[buy_condition, 'Signal'] = 1
-        signals.loc[sell_condition, 'Signal'] = -1
+        print(f"🔄 Backtesting {len(frames)} stocks ({total_bars:,} bars) on {workers} processes...")
+        jobs = [(data['Close'].to_numpy(), data['Signal'].to_numpy(), *self._execution_inputs(data))
+                for data in frames.values()]
         
-        print(f"📈 {symbol}: {signals['Signal'].abs().sum()} signals generated")
-        return signals
+        # A few chunks per worker balances uneven histories
+        chunk_size = max(1, -(-len(jobs) // (workers * 4)))
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            simulations = [sim for chunk in pool.map(simulate_many, chunks,
+                                                     [config.INITIAL_CAPITAL] * len(chunks),
+                                                     [config.POSITION_SIZE] * len(chunks),
+                                                     [self.execution] * len(chunks))
+                           for sim in chunk]
+        
+        return {
+            symbol: self._summarize(symbol, np.asarray(close, dtype=np.float64), data.index, simulation, open_)
+            for (symbol, data), (close, _, open_, _), simulation in zip(frames.items(), jobs, simulations)
+        }
     
-    def backtest(self, data_with_signals, symbol):
-        """Backtest the strategy"""
-        print(f"🔄 Backtesting {symbol}...")
+    def _summarize(self, symbol, close, dates, simulation, open_=None):
+        """Build the result dict from simulate_long_only output (None without trades)
+        
+        Fill prices and costs of every trade are recomputed at once from the
+        execution model: PnL is net of slippage and fees, Gross_PnL is at
+        the unslipped fill-bar prices and Costs is the difference.
+        """
+        entries, exits, trade_shares, cash, shares = simulation
+        
+        base = self.execution.base_prices(close, open_)
+        entry_prices = self.execution.fill_prices(base[entries], BUY)
+        exit_prices = self.execution.fill_prices(base[exits], SELL)
+        cost_basis = trade_shares * entry_prices
+        entry_fees = self.execution.fees(cost_basis)
+        # Capital actually spent on each entry, the base for PnL_Percent
+        invested = cost_basis + entry_fees
+        fees = entry_fees + self.execution.fees(trade_shares * exit_prices)
+        pnls = trade_shares * exit_prices - cost_basis - fees
+        gross_pnls = trade_shares * base[exits] - trade_shares * base[entries]
         
         trades = []
-        cash = config.INITIAL_CAPITAL
-        shares = 0
-        
-        for date, row in data_with_signals.iterrows():
-            current_price = row['Close']
-            signal = row['Signal']
-            
-            if signal == 1 and shares == 0:  # Buy
-                position_value = (cash + shares * current_price) * config.POSITION_SIZE
-                shares_to_buy = int(position_value / current_price)
-                
-                if shares_to_buy > 0 and cash >= shares_to_buy * current_price:
-                    shares = shares_to_buy
-                    cash -= shares * current_price
-                    entry_date = date
-                    entry_price = current_price
-            
-            elif signal == -1 and shares > 0:  # Sell
-                revenue = shares * current_price
-                cash += revenue
-                
-                pnl = revenue - (shares * entry_price)
-                pnl_percent = (pnl / (shares * entry_price)) * 100
-                
-                trades.append({
-                    'Entry_Date': entry_date,
-                    'Exit_Date': date,
-                    'Entry_Price': entry_price,
-                    'Exit_Price': current_price,
-                    'Shares': shares,
-                    'PnL': pnl,
-                    'PnL_Percent': pnl_percent
-                })
-                shares = 0
+        for i, (entry_date, exit_date) in enumerate(zip(dates[entries], dates[exits])):
+            trades.append({
+                'Entry_Date': entry_date,
+                'Exit_Date': exit_date,
+                'Entry_Price': entry_prices[i],
+                'Exit_Price': exit_prices[i],
+                'Shares': int(trade_shares[i]),
+                'PnL': pnls[i],
+                'PnL_Percent': (pnls[i] / invested[i]) * 100,
+                'Gross_PnL': gross_pnls[i],
+                'Costs': gross_pnls[i] - pnls[i]
+            })
 
         if not trades:
             print(f"⚠️ {symbol}: No trades executed during backtest period.")
@@ -87,8 +150,9 @@ class TradingStrategy:
         winning_trades = len([t for t in trades if t['PnL'] > 0])
         win_rate = winning_trades / total_trades
         total_pnl = sum([t['PnL'] for t in trades])
+        gross_pnl = sum([t['Gross_PnL'] for t in trades])
         
-        final_value = cash + shares * data_with_signals['Close'].iloc[-1]
+        final_value = cash + shares * close[-1]
         total_return = ((final_value - config.INITIAL_CAPITAL) / config.INITIAL_CAPITAL) * 100
         
         result = {
@@ -97,11 +161,14 @@ class TradingStrategy:
             'winning_trades': winning_trades,
             'win_rate': win_rate,
             'total_pnl': total_pnl,
+            'gross_pnl': gross_pnl,
+            'total_costs': gross_pnl - total_pnl,
             'total_return': total_return,
             'trades': trades
         }
         
-        print(f"✅ {symbol}: {total_trades} trades, {win_rate:.1%} win rate, ₹{total_pnl:.2f} P&L")
+        costs = f" (gross ₹{gross_pnl:.2f})" if gross_pnl != total_pnl else ""
+        print(f"✅ {symbol}: {total_trades} trades, {win_rate:.1%} win rate, ₹{total_pnl:.2f} P&L{costs}")
         return result
     
     def get_current_signals(self, data_dict):
@@ -0,0 +1,111 @@
+# src/sweep.py
+
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import config
+from src.strategy import signal_array
+from src.backtest_engine import simulate_long_only
+
+# Per-worker copy of the indicator arrays, installed once by _init_worker
+_SYMBOL_ARRAYS = None
+
+
+def _init_worker(symbol_arrays):
+    global _SYMBOL_ARRAYS
+    _SYMBOL_ARRAYS = symbol_arrays
+
+
+def _evaluate(combos, symbol_arrays=None):
+    """Backtest each (rsi_buy, rsi_sell, ma_short, ma_long) combination over every symbol"""
+    symbol_arrays = symbol_arrays if symbol_arrays is not None else _SYMBOL_ARRAYS
+    rows = []
+
+    for rsi_buy, rsi_sell, ma_short, ma_long in combos:
+        trades = wins = 0
+        total_pnl = 0.0
+        returns = []
+
+        for close, rsi, ma in symbol_arrays:
+            signal = signal_array(rsi, ma[ma_short], ma[ma_long], rsi_buy, rsi_sell)
+            entries, exits, shares, cash, open_shares = simulate_long_only(
+                close, signal, config.INITIAL_CAPITAL, config.POSITION_SIZE
+            )
+            pnl = shares * close[exits] - shares * close[entries]
+            trades += len(pnl)
+            wins += int((pnl > 0).sum())
+            total_pnl += float(pnl.sum())
+
+            final_value = cash + open_shares * close[-1]
+            returns.append((final_value - config.INITIAL_CAPITAL) / config.INITIAL_CAPITAL * 100)
+
+        rows.append({
+            'RSI_Buy': rsi_buy,
+            'RSI_Sell': rsi_sell,
+            'MA_Short': ma_short,
+            'MA_Long': ma_long,
+            'Total_Trades': trades,
+            'Win_Rate': wins / trades if trades else 0.0,
+            'Total_PnL': total_pnl,
+            'Avg_Return': float(np.mean(returns)) if returns else 0.0
+        })
+
+    return rows
+
+
+class ParameterSweep:
+    """Grid search of RSI thresholds and MA periods over all symbols"""
+
+    def __init__(self, workers=None):
+        self.workers = workers or config.SWEEP_WORKERS or os.cpu_count() or 1
+
+    def combinations(self, grid):
+        """Valid (rsi_buy, rsi_sell, ma_short, ma_long) tuples from a grid dict"""
+        return [
+            (buy, sell, short, long)
+            for buy, sell, short, long in itertools.product(
+                grid['rsi_buy'], grid['rsi_sell'], grid['ma_short'], grid['ma_long']
+            )
+            if buy < sell and short < long
+        ]
+
+    def prepare(self, stock_data, ma_periods):
+        """Compute the shared per-symbol arrays once: (close, rsi, {period: ma})"""
+        symbol_arrays = []
+        for data in stock_data.values():
+            if data is None or len(data) == 0:
+                continue
+            close = data['Close'].to_numpy(dtype=np.float64)
+            ma = {}
+            for period in ma_periods:
+                column = f'MA_{period}'
+                series = data[column] if column in data else data['Close'].rolling(window=period).mean()
+                ma[period] = series.to_numpy(dtype=np.float64)
+            symbol_arrays.append((close, data['RSI'].to_numpy(dtype=np.float64), ma))
+        return symbol_arrays
+
+    def run(self, stock_data, grid=None):
+        """Evaluate every combination and return results ranked by total P&L"""
+        grid = grid or config.SWEEP_GRID
+        combos = self.combinations(grid)
+        symbol_arrays = self.prepare(stock_data, set(grid['ma_short']) | set(grid['ma_long']))
+        print(f"🔍 Sweeping {len(combos)} parameter sets over {len(symbol_arrays)} stocks "
+              f"with {self.workers} worker(s)...")
+
+        if self.workers <= 1 or len(combos) < 2 * self.workers:
+            rows = _evaluate(combos, symbol_arrays)
+        else:
+            # Several chunks per worker keeps the pool balanced; the price
+            # arrays are shipped to each worker once, not per combination
+            chunk_size = max(1, len(combos) // (self.workers * 4))
+            chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(symbol_arrays,)) as pool:
+                rows = [row for chunk_rows in pool.map(_evaluate, chunks) for row in chunk_rows]
+
+        results = pd.DataFrame(rows)
+        if results.empty:
+            return results
+        return results.sort_values(['Total_PnL', 'Win_Rate'], ascending=False).reset_index(drop=True)
@@ -1,42 +1,173 @@
 # src/telegram_bot.py
 
-import requests
+import time
+import queue
+import threading
 from datetime import datetime
 import config
 
 class TelegramBot:
-    """Handle Telegram notifications"""
+    """Handle Telegram notifications
     
-    def __init__(self):
+    Messages are handed to a background worker through a bounded queue so the
+    pipeline never waits on Telegram. The worker reuses one HTTP session,
+    spaces requests per TELEGRAM_MIN_INTERVAL, retries with backoff (honouring
+    429 retry_after) and coalesces queued messages into a single request.
+    """
+    
+    MAX_MESSAGE_LENGTH = 4096
+    
+    def __init__(self, async_mode=None, api_url=None):
         self.bot_token = config.TELEGRAM_BOT_TOKEN
         self.chat_id = config.TELEGRAM_CHAT_ID
         self.enabled = bool(self.bot_token and self.chat_id)
+        self.async_mode = config.TELEGRAM_ASYNC if async_mode is None else async_mode
+        self.api_url = api_url or config.TELEGRAM_API_URL
+        
+        self.session = None  # created on first send
+        self.queue = queue.Queue(maxsize=config.TELEGRAM_QUEUE_SIZE)
+        self.worker = None
+        self.last_sent = 0.0
+        self.sent_count = 0
+        self.dropped_count = 0
         
         if self.enabled:
             print("📱 Telegram bot enabled")
         else:
             print("📱 Telegram bot disabled (optional)")
     
+    def _post(self, message):
+        """Send one request, rate limited and retried with exponential backoff"""
+        if self.session is None:
+            import requests
+            self.session = requests.Session()
+        
+        url = f"{self.api_url}/bot{self.bot_token}/sendMessage"
+        data = {
+            'chat_id': self.chat_id,
+            'text': message,
+            'parse_mode': 'HTML'
+        }
+        
+        for attempt in range(config.TELEGRAM_RETRIES + 1):
+            wait = self.last_sent + config.TELEGRAM_MIN_INTERVAL - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            
+            delay = config.TELEGRAM_RETRY_BACKOFF * 2 ** attempt
+            try:
+                response = self.session.post(url, data=data, timeout=config.TELEGRAM_TIMEOUT)
+                self.last_sent = time.monotonic()
+                if response.status_code == 200:
+                    self.sent_count += 1
+                    return True
+                if response.status_code == 429:
+                    try:
+                        delay = response.json()['parameters']['retry_after']
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                elif response.status_code < 500:
+                    print(f"⚠️ Telegram rejected message: HTTP {response.status_code}")
+                    return False
+            except Exception as e:
+                print(f"⚠️ Telegram error: {str(e)}")
+            
+            if attempt < config.TELEGRAM_RETRIES:
+                time.sleep(delay)
+        return False
+    
+    def _split(self, lines, limit=None):
+        """Group lines into newline-joined chunks of at most limit characters
+        
+        A line longer than the limit on its own is cut into pieces.
+        """
+        limit = limit or self.MAX_MESSAGE_LENGTH
+        chunks, current = [], ""
+        for line in lines:
+            while len(line) > limit:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(line[:limit])
+                line = line[limit:]
+            candidate = f"{current}\n{line}" if current else line
+            if current and len(candidate) > limit:
+                chunks.append(current)
+                current = line
+            else:
+                current = candidate
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _deliver(self, message):
+        """Post a message, split into several requests if it is over the size limit"""
+        if len(message) <= self.MAX_MESSAGE_LENGTH:
+            return self._post(message)
+        results = [self._post(chunk) for chunk in self._split(message.split("\n"))]
+        return all(results)
+    
+    def _run(self):
+        """Worker loop: drain the queue, coalescing messages up to the size limit"""
+        while True:
+            message = self.queue.get()
+            if message is None:
+                return
+            
+            stop = False
+            batch = [message]
+            while not stop:
+                try:
+                    pending = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stop = True
+                elif len("\n\n".join(batch + [pending])) > self.MAX_MESSAGE_LENGTH:
+                    self._deliver("\n\n".join(batch))
+                    batch = [pending]
+                else:
+                    batch.append(pending)
+            
+            self._deliver("\n\n".join(batch))
+            if stop:
+                return
+    
     def send_message(self, message):
-        """Send message to Telegram"""
+        """Send message to Telegram (queued for the worker in async mode)"""
         if not self.enabled:
             return False
         
+        if not self.async_mode:
+            return self._deliver(message)
+        
+        if self.worker is None:
+            self.worker = threading.Thread(target=self._run, name='telegram-dispatcher', daemon=True)
+            self.worker.start()
+        
         try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-            data = {
-                'chat_id': self.chat_id,
-                'text': message,
-                'parse_mode': 'HTML'
-            }
-            
-            response = requests.post(url, data=data, timeout=10)
-            return response.status_code == 200
-            
-        except Exception as e:
-            print(f"⚠️ Telegram error: {str(e)}")
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.dropped_count += 1
+            print("⚠️ Telegram queue full - message dropped")
             return False
     
+    def close(self, timeout=None):
+        """Deliver queued messages and stop the worker, waiting at most timeout seconds"""
+        if self.worker is None:
+            return
+        
+        timeout = config.TELEGRAM_CLOSE_TIMEOUT if timeout is None else timeout
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.worker.join(timeout)
+        if self.worker.is_alive():
+            print(f"⚠️ Telegram messages still pending after {timeout}s")
+        self.worker = None
+    
     def send_signal_alert(self, signal):
         """Send trading signal alert"""
         if not self.enabled or signal['Signal'] == 'HOLD':
@@ -57,6 +188,31 @@ class TelegramBot:
         
         self.send_message(message.strip())
     
+    def send_signal_alerts(self, signals):
+        """Send all BUY/SELL signals coalesced into as few messages as the size limit allows"""
+        actionable = [s for s in signals if s['Signal'] != 'HOLD']
+        if not self.enabled or not actionable:
+            return
+        
+        if len(actionable) == 1:
+            self.send_signal_alert(actionable[0])
+            return
+        
+        header = f"📢 <b>{len(actionable)} TRADING SIGNALS</b>\n"
+        footer = f"\n<b>Time:</b> {datetime.now().strftime('%H:%M:%S')}"
+        lines = []
+        for signal in actionable:
+            emoji = "🚀" if signal['Signal'] == 'BUY' else "💰"
+            lines.append(f"{emoji} <b>{signal['Symbol']}</b>: {signal['Signal']} "
+                         f"at ₹{signal['Price']:.2f} (RSI {signal['RSI']:.1f})")
+        
+        # Room for the header on the first chunk and the footer on the last
+        chunks = self._split(lines, self.MAX_MESSAGE_LENGTH - len(header) - len(footer) - 2)
+        chunks[0] = f"{header}\n{chunks[0]}"
+        chunks[-1] = f"{chunks[-1]}\n{footer}"
+        for chunk in chunks:
+            self.send_message(chunk)
+    
     def send_summary(self, summary_data):
         """Send daily summary"""
         if not self.enabled:
@@ -0,0 +1,151 @@
+# src/tuning.py
+
+import os
+import json
+import time
+from datetime import datetime
+import numpy as np
+import config
+from src.model_registry import fingerprint_config
+
+
+def data_profile(mean, std, target_rate, rows):
+    """Training window statistics kept with a search result to detect drift"""
+    return {
+        'mean': np.asarray(mean, dtype=np.float64).tolist(),
+        'std': np.asarray(std, dtype=np.float64).tolist(),
+        'target_rate': float(target_rate),
+        'rows': int(rows)
+    }
+
+
+def drift_score(reference, profile):
+    """Largest shift of a feature mean or of the target rate, in reference standard deviations"""
+    ref_mean = np.array(reference['mean'] + [reference['target_rate']])
+    new_mean = np.array(profile['mean'] + [profile['target_rate']])
+    rate = reference['target_rate']
+    ref_std = np.array(reference['std'] + [np.sqrt(rate * (1 - rate))])
+    if ref_mean.shape != new_mean.shape:
+        return np.inf
+
+    shift = np.abs(new_mean - ref_mean)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(ref_std > 0, shift / ref_std, np.where(shift > 0, np.inf, 0.0))
+    return float(scores.max())
+
+
+class HyperparameterTuner:
+    """RandomForest hyperparameter search whose result is reused across runs
+
+    Results are stored in ML_PARAMS_PATH under a key fingerprinting the
+    search space and the caller's settings (feature set, training mode),
+    together with the training window's statistics. A stored result is reused until it is ML_RETUNE_DAYS old or
+    the features / target drift by more than ML_DRIFT_THRESHOLD standard
+    deviations. Searches use successive halving (HalvingGridSearchCV) by
+    default: every configuration starts on a small sample and only the best
+    third survives each round, so most candidates never see the full data.
+    """
+
+    def __init__(self, param_grid, settings, path=None):
+        self.param_grid = param_grid
+        self.path = config.ML_PARAMS_PATH if path is None else path
+        self.key = fingerprint_config({
+            'param_grid': param_grid,
+            'method': config.ML_TUNING,
+            **settings
+        })
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                cache = json.load(f)
+            return cache if isinstance(cache.get('searches'), dict) else {'searches': {}}
+        except (FileNotFoundError, ValueError):
+            return {'searches': {}}
+
+    def _save(self, entry):
+        if not self.path:
+            return
+        try:
+            cache = self._load()
+            cache['searches'][self.key] = entry
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"⚠️  Could not save tuning results: {str(e)}")
+
+    def cached(self):
+        """The stored search result for this search space, or None"""
+        return self._load()['searches'].get(self.key)
+
+    def stale_reason(self, profile):
+        """Why the stored search should be redone for this data, or None to reuse it"""
+        entry = self.cached()
+        if entry is None:
+            return "no previous search"
+
+        age = datetime.now() - datetime.fromisoformat(entry['tuned_at'])
+        if config.ML_RETUNE_DAYS is not None and age.days >= config.ML_RETUNE_DAYS:
+            return f"last search {age.days} days old"
+
+        drift = drift_score(entry['profile'], profile)
+        if drift > config.ML_DRIFT_THRESHOLD:
+            return f"data drifted {drift:.2f} std since last search"
+        return None
+
+    def best_params(self, X, y, profile, force=False):
+        """Hyperparameters for this training window, searching only when needed"""
+        if config.ML_FIXED_PARAMS:
+            return dict(config.ML_FIXED_PARAMS)
+
+        reason = "requested" if force else self.stale_reason(profile)
+        if reason is None:
+            entry = self.cached()
+            print(f"♻️  Reusing RF hyperparameters tuned {entry['tuned_at']}")
+            return entry['best_params']
+
+        print(f"🔎 Tuning RF hyperparameters ({reason})...")
+        start = time.perf_counter()
+        search = self.search(X, y)
+        elapsed = time.perf_counter() - start
+
+        n_candidates = int(np.prod([len(values) for values in self.param_grid.values()]))
+        fits = len(search.cv_results_['params']) * search.n_splits_
+        # Halving fits on growing samples; express the work in full-sample fits
+        resources = search.cv_results_.get('n_resources')
+        full_fits = fits * np.mean(resources) / np.max(resources) if resources is not None else fits
+        print(f"✅ Best of {n_candidates} configs after {fits} fits (~{full_fits:.0f} full-sample) "
+              f"in {elapsed:.1f}s; full grid: {n_candidates * search.n_splits_}: {search.best_params_}")
+
+        self._save({
+            'best_params': search.best_params_,
+            'best_score': float(search.best_score_),
+            'tuned_at': datetime.now().isoformat(timespec='seconds'),
+            'fits': fits,
+            'full_sample_fits': round(float(full_fits), 1),
+            'seconds': round(elapsed, 2),
+            'profile': profile
+        })
+        return search.best_params_
+
+    def search(self, X, y):
+        """Fitted search over param_grid on time-ordered folds"""
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
+
+        estimator = RandomForestClassifier(random_state=config.ML_RANDOM_STATE)
+        cv = TimeSeriesSplit(n_splits=3)
+        if config.ML_TUNING == 'grid':
+            search = GridSearchCV(estimator, self.param_grid, cv=cv, n_jobs=-1)
+        else:
+            from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+            from sklearn.model_selection import HalvingGridSearchCV
+
+            search = HalvingGridSearchCV(estimator, self.param_grid, cv=cv, factor=3,
+                                         random_state=config.ML_RANDOM_STATE, n_jobs=-1)
+        return search.fit(X, y)